@@ -1,18 +1,26 @@
 # backend/app/auth.py
 import os
-from typing import Dict
+from typing import Dict, Optional
 
-from fastapi import HTTPException, Request
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 ALLOWED_EMAIL = os.getenv("TP_ALLOWED_EMAIL")
 ACTIVE_TOKENS: set[str] = set()
 
+# Single-user app: every authenticated request resolves to the same user.
+_USER_DICT: Dict = {"email": ALLOWED_EMAIL}
 
-def get_current_user(request: Request) -> Dict:
-    auth = request.headers.get("Authorization")
-    if not auth or not auth.startswith("Bearer "):
+# Parses "Authorization: Bearer <token>"; yields None instead of raising so
+# we keep our own 401 messages.
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def get_current_user(
+    creds: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> Dict:
+    if creds is None:
         raise HTTPException(status_code=401, detail="Not authenticated")
-    token = auth.split(" ", 1)[1]
-    if token not in ACTIVE_TOKENS:
+    if creds.credentials not in ACTIVE_TOKENS:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
-    return {"email": ALLOWED_EMAIL}
+    return _USER_DICT
@@ -1,8 +1,9 @@
 import os
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
+from functools import cached_property
 
 
-@dataclass
+@dataclass(frozen=True)
 class AppConfig:
     app_name: str = os.getenv("APP_NAME", "TradePopping")
     app_env: str = os.getenv("APP_ENV", "development")
@@ -15,16 +16,20 @@ class AppConfig:
         Only expose safe fields to the frontend.
         Never include secrets or raw codes here.
         """
-        base = asdict(self)
+        return self._public_dict
+
+    @cached_property
+    def _public_dict(self) -> dict:
+        # Config is fixed after startup, so build the public shape once.
         # Don't leak entry codes or secrets; allowed_email is okay-ish for single-user
         return {
-            "app_name": base["app_name"],
-            "environment": base["app_env"],
-            "version": base["app_version"],
-            "backend_environment": base["api_env"],
+            "app_name": self.app_name,
+            "environment": self.app_env,
+            "version": self.app_version,
+            "backend_environment": self.api_env,
             "auth": {
                 "mode": "single-user",
-                "email": base["allowed_email"],
+                "email": self.allowed_email,
             },
         }
 
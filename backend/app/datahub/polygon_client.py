@@ -1,11 +1,14 @@
 # backend/app/datahub/polygon_client.py
 
 import os
+import time
 from datetime import date, datetime, timezone
+from functools import lru_cache
+from operator import itemgetter
 from typing import List, Optional, TypedDict
 
 import httpx
-from pydantic import BaseModel
+import orjson
 
 
 class PolygonClientError(Exception):
@@ -27,6 +30,9 @@ class PriceBarDTO(TypedDict):
     volume: float
 
 
+# Fields every aggregate row must carry (non-null) to become a bar.
+_ROW_FIELDS = itemgetter("t", "o", "h", "l", "c", "v")
+
 POLYGON_API_KEY = os.getenv("POLYGON_API_KEY", "").strip()
 
 
@@ -43,6 +49,43 @@ def _ensure_api_key() -> str:
     return POLYGON_API_KEY
 
 
+@lru_cache(maxsize=1)
+def _get_client() -> httpx.AsyncClient:
+    """
+    Shared HTTP client so repeated fetches reuse pooled keep-alive
+    connections (and their TLS sessions) to api.polygon.io, over HTTP/2
+    like the EODHD and FMP clients.
+    """
+    return httpx.AsyncClient(
+        timeout=15.0,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20),
+    )
+
+
+async def aclose_client() -> None:
+    """Close the shared HTTP client, if one was created."""
+    if _get_client.cache_info().currsize:
+        await _get_client().aclose()
+        _get_client.cache_clear()
+
+
+# [monotonic timestamp, UTC date]; refreshed at most once a minute.
+_TODAY_CACHE: list = [float("-inf"), None]
+
+
+def _utc_today() -> date:
+    """
+    Today's date in UTC, cached for 60 seconds since it's needed on every
+    request but only changes once a day.
+    """
+    now = time.monotonic()
+    if now - _TODAY_CACHE[0] >= 60.0:
+        _TODAY_CACHE[1] = datetime.now(timezone.utc).date()
+        _TODAY_CACHE[0] = now
+    return _TODAY_CACHE[1]
+
+
 def _clamp_dates(
     start: date,
     end: date,
@@ -59,14 +102,12 @@ def _clamp_dates(
     """
     if today is None:
         # Use UTC so we behave consistently inside the container
-        today = datetime.now(timezone.utc).date()
+        today = _utc_today()
 
     if start > today:
         raise ValueError("Start date cannot be in the future.")
 
-    if end > today:
-        end = today
-
+    end = min(end, today)
     if end < start:
         raise ValueError("End date cannot be before start date.")
 
@@ -108,14 +149,13 @@ async def fetch_polygon_daily_ohlcv(
         "limit": 5000,
     }
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        resp = await client.get(url, params=params)
+    resp = await _get_client().get(url, params=params)
 
     # If Polygon itself errors (401, 403, 5xx etc.), raise a clear error
     if resp.status_code >= 400:
         raise RuntimeError(f"Polygon HTTP error {resp.status_code}: {resp.text}")
 
-    data = resp.json()
+    data = orjson.loads(resp.content)
 
     # Polygon returns:
     # {
@@ -137,35 +177,33 @@ async def fetch_polygon_daily_ohlcv(
     if not results:
         return []
 
+    # Hot globals are bound locally and each row's six fields are fetched
+    # with one C-level itemgetter call; large windows return thousands of
+    # rows and this loop dominates the fetch's CPU time.
+    # t is epoch millis in UTC; rows missing any OHLCV value are skipped.
+    from_ts = datetime.fromtimestamp
+    utc = timezone.utc
+    row_fields = _ROW_FIELDS
     bars: List[PriceBarDTO] = []
+    append = bars.append
 
     for row in results:
-        # t is epoch millis in UTC
-        ts_ms = row.get("t")
-        if ts_ms is None:
+        try:
+            t, o, h, l, c, v = row_fields(row)
+        except KeyError:
             continue
-
-        dt = datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc)
-
-        o = row.get("o")
-        h = row.get("h")
-        l = row.get("l")
-        c = row.get("c")
-        v = row.get("v")
-
-        # basic sanity check
-        if any(val is None for val in (o, h, l, c, v)):
+        if None in (t, o, h, l, c, v):
             continue
 
-        bars.append(
-            PriceBarDTO(
-                time=dt.isoformat(),
-                open=float(o),
-                high=float(h),
-                low=float(l),
-                close=float(c),
-                volume=float(v),
-            )
+        append(
+            {
+                "time": from_ts(t / 1000, utc).isoformat(),
+                "open": float(o),
+                "high": float(h),
+                "low": float(l),
+                "close": float(c),
+                "volume": float(v),
+            }
         )
 
     return bars
@@ -20,12 +20,17 @@ We fetch a snapshot from FMP and upsert rows by symbol.
 """
 
 import asyncio
+import atexit
+import functools
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Optional, Sequence, Tuple
 
 import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
 from app.datahub.fmp_client import FMPSymbolDTO, fetch_fmp_universe
+from app.datalake.duckdb_settings import apply_duckdb_settings
 
 # Where the DuckDB file lives inside the backend container
 TP_DUCKDB_PATH: str = os.getenv(
@@ -39,13 +44,26 @@ if _db_dir:
     os.makedirs(_db_dir, exist_ok=True)
 
 
+@functools.lru_cache(maxsize=1)
+def _conn() -> duckdb.DuckDBPyConnection:
+    """
+    Process-wide DuckDB connection, opened once on first use.
+    """
+    con = duckdb.connect(TP_DUCKDB_PATH)
+    apply_duckdb_settings(con)
+    atexit.register(con.close)
+    return con
+
+
 def _get_connection(read_only: bool = False) -> duckdb.DuckDBPyConnection:
     """
-    Open a DuckDB connection.
+    Cursor on the shared connection (same pattern as bar_store).
 
-    Same pattern as bar_store: open on-demand and close in each function.
+    Closing it in each function only releases the cursor. read_only is
+    kept for callers but cannot be honoured: DuckDB refuses a read-only
+    open of a file this process already holds read-write.
     """
-    return duckdb.connect(TP_DUCKDB_PATH, read_only=read_only)
+    return _conn().cursor()
 
 
 def _ensure_schema() -> None:
@@ -78,51 +96,92 @@ def _ensure_schema() -> None:
 _ensure_schema()
 
 
-def _normalize_row(row: FMPSymbolDTO) -> Optional[Tuple]:
-    """
-    Map a raw FMPSymbolDTO into our universe_symbols row tuple.
+# Column types for the upsert batch, in universe_symbols column order.
+_UNIVERSE_ARROW_SCHEMA = pa.schema(
+    [
+        ("symbol", pa.string()),
+        ("name", pa.string()),
+        ("exchange", pa.string()),
+        ("sector", pa.string()),
+        ("industry", pa.string()),
+        ("market_cap", pa.float64()),
+        ("is_etf", pa.bool_()),
+        ("is_fund", pa.bool_()),
+        ("is_active", pa.bool_()),
+        ("updated_at", pa.timestamp("us")),
+    ]
+)
 
-    Returns None if the row is unusable (e.g. missing symbol).
-    """
-    symbol = row.get("symbol")
-    if not symbol:
-        return None
 
-    symbol = symbol.upper().strip()
-    if not symbol:
+def _to_market_cap(value) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "", 0) else None
+    except (TypeError, ValueError):
         return None
 
-    name = row.get("companyName") or row.get("company_name") or ""
 
-    exchange = (row.get("exchange") or "").upper() or None
-    sector = row.get("sector") or None
-    industry = row.get("industry") or None
+def _flag_column(rows: Sequence[FMPSymbolDTO], key: str) -> pa.Array:
+    # One dict probe per row; absent and null flags are both unknown.
+    return pa.array([None if (v := r.get(key)) is None else bool(v) for r in rows], pa.bool_())
+
+
+def _normalize_batch(rows: Sequence[FMPSymbolDTO]) -> pa.Table:
+    """
+    Map raw FMPSymbolDTO rows into one universe_symbols Arrow batch.
+
+    Fields are gathered column-wise and the string / numeric clean-up runs
+    in Arrow compute kernels. Rows without a usable symbol are dropped, and
+    a repeated symbol keeps its last row: one set-based INSERT OR REPLACE
+    cannot touch the same key twice.
+    """
+    n = len(rows)
+
+    symbol = pc.utf8_upper(
+        pc.utf8_trim_whitespace(pa.array([r.get("symbol") or None for r in rows], pa.string()))
+    )
+    name = pa.array(
+        [r.get("companyName") or r.get("company_name") or "" for r in rows], pa.string()
+    )
+    exchange = pc.utf8_upper(pa.array([r.get("exchange") or None for r in rows], pa.string()))
+    sector = pa.array([r.get("sector") or None for r in rows], pa.string())
+    industry = pa.array([r.get("industry") or None for r in rows], pa.string())
 
-    mc_raw = row.get("marketCap")
+    # FMP sends numbers; only fall back to per-row parsing for odd payloads.
+    mc_raw = [r.get("marketCap") for r in rows]
     try:
-        market_cap = float(mc_raw) if mc_raw not in (None, "", 0) else None
-    except (TypeError, ValueError):
-        market_cap = None
-
-    is_etf = bool(row.get("isEtf")) if "isEtf" in row else None
-    is_fund = bool(row.get("isFund")) if "isFund" in row else None
-    is_active = bool(row.get("isActivelyTrading")) if "isActivelyTrading" in row else None
-
-    updated_at = datetime.utcnow()
-
-    return (
-        symbol,
-        name,
-        exchange,
-        sector,
-        industry,
-        market_cap,
-        is_etf,
-        is_fund,
-        is_active,
-        updated_at,
+        market_cap = pa.array(mc_raw, pa.float64())
+        market_cap = pc.if_else(pc.equal(market_cap, 0), None, market_cap)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+        market_cap = pa.array([_to_market_cap(v) for v in mc_raw], pa.float64())
+
+    is_etf = _flag_column(rows, "isEtf")
+    is_fund = _flag_column(rows, "isFund")
+    is_active = _flag_column(rows, "isActivelyTrading")
+
+    # One snapshot timestamp for the whole batch.
+    updated_at = pa.array([datetime.now(timezone.utc).replace(tzinfo=None)] * n, pa.timestamp("us"))
+
+    batch = pa.Table.from_arrays(
+        [
+            symbol,
+            name,
+            exchange,
+            sector,
+            industry,
+            market_cap,
+            is_etf,
+            is_fund,
+            is_active,
+            updated_at,
+        ],
+        schema=_UNIVERSE_ARROW_SCHEMA,
     )
 
+    last_index = {sym: i for i, sym in enumerate(symbol.to_pylist()) if sym}
+    if len(last_index) == n:
+        return batch
+    return batch.take(sorted(last_index.values()))
+
 
 def upsert_fmp_symbols(symbols: Sequence[FMPSymbolDTO]) -> int:
     """
@@ -134,19 +193,15 @@ def upsert_fmp_symbols(symbols: Sequence[FMPSymbolDTO]) -> int:
     if not symbols:
         return 0
 
-    records: List[Tuple] = []
-    for raw in symbols:
-        row = _normalize_row(raw)
-        if row is not None:
-            records.append(row)
-
-    if not records:
+    batch = _normalize_batch(symbols)
+    if batch.num_rows == 0:
         return 0
 
+    # A single statement commits atomically on its own.
     con = _get_connection(read_only=False)
     try:
-        con.execute("BEGIN")
-        con.executemany(
+        con.register("_tmp_universe", batch)
+        con.execute(
             """
             INSERT OR REPLACE INTO universe_symbols (
                 symbol,
@@ -160,21 +215,13 @@ def upsert_fmp_symbols(symbols: Sequence[FMPSymbolDTO]) -> int:
                 is_active,
                 updated_at
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            records,
+            SELECT * FROM _tmp_universe
+            """
         )
-        con.execute("COMMIT")
-    except Exception:
-        try:
-            con.execute("ROLLBACK")
-        except Exception:
-            pass
-        raise
     finally:
         con.close()
 
-    return len(records)
+    return batch.num_rows
 
 
 def read_universe(limit: int = 20) -> List[Tuple]:
@@ -217,9 +264,8 @@ async def ingest_fmp_universe() -> None:
     print(f"[FMP] Upserted {written} rows into universe_symbols", flush=True)
 
     sample = read_universe(limit=5)
-    print("[FMP] Top 5 by market cap:", flush=True)
-    for row in sample:
-        print("   ", row, flush=True)
+    # One write for the whole sample rather than a flushed print per row.
+    print("[FMP] Top 5 by market cap:", *(f"    {row}" for row in sample), sep="\n", flush=True)
 
 
 if __name__ == "__main__":
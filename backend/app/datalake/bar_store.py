@@ -12,29 +12,57 @@ Simple DuckDB-backed cache for daily OHLCV bars.
 from __future__ import annotations
 
 import asyncio
+import atexit
+import contextlib
+import functools
 import os
-from datetime import date, datetime
-from typing import List, Optional, Sequence
+import queue
+import threading
+from datetime import date
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 import duckdb
-from app.datalake.eodhd_client import PriceBarDTO, fetch_eodhd_daily_ohlcv
+import pyarrow as pa
+import pyarrow.compute as pc
+from app.datalake.duckdb_settings import apply_duckdb_settings
+from app.datalake.eodhd_client import PriceBarDTO, fetch_eodhd_daily_table
 
 TP_DUCKDB_PATH: str = os.getenv("TP_DUCKDB_PATH", "/data/tradepopping.duckdb")
+TP_DUCKDB_POOL_SIZE: int = int(os.getenv("TP_DUCKDB_POOL_SIZE", "4"))
+# Fetched-but-not-yet-written batches buffered by ingest_eodhd_universe.
+_INGEST_QUEUE_SIZE = 16
+# Rows ingest_eodhd_universe accumulates across symbols per commit.
+_INGEST_COMMIT_ROWS = 4000
+# Max rows per Arrow batch handed to DuckDB during an upsert.
+TP_DUCKDB_FLUSH_THRESHOLD: int = int(os.getenv("TP_DUCKDB_FLUSH_THRESHOLD", "2000"))
 
 _db_dir = os.path.dirname(TP_DUCKDB_PATH)
 if _db_dir:
     os.makedirs(_db_dir, exist_ok=True)
 
 
-def _get_connection(read_only: bool = False) -> duckdb.DuckDBPyConnection:
-    return duckdb.connect(TP_DUCKDB_PATH, read_only=read_only)
+@functools.lru_cache(maxsize=1)
+def _conn() -> duckdb.DuckDBPyConnection:
+    """
+    Process-wide DuckDB connection, opened once on first use.
+
+    Callers take a cursor from it (``_conn().cursor()``) so each call gets
+    its own transaction context without re-opening the database file.
+    A read-only open of the same file is not possible while this handle
+    is alive, so reads go through it as well.
+    """
+    con = duckdb.connect(TP_DUCKDB_PATH)
+    apply_duckdb_settings(con)
+    atexit.register(con.close)
+    return con
 
 
 def _ensure_schema() -> None:
     """
     Create hot + archive tables if they do not exist.
     """
-    con = _get_connection(read_only=False)
+    con = _conn().cursor()
     try:
         con.execute(
             """
@@ -84,155 +112,440 @@ def _ensure_schema() -> None:
         con.close()
 
 
+# Tables are created once at import; the functions below assume they exist.
 _ensure_schema()
 
 
+class _Pool:
+    """
+    Fixed set of cursors on the shared connection, used for reads.
+
+    One DuckDB cursor runs one query at a time; giving each concurrent
+    reader its own cursor lets FastAPI worker threads query in parallel.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._cursors: queue.Queue[duckdb.DuckDBPyConnection] = queue.Queue()
+        for _ in range(max(1, size)):
+            self._cursors.put(_conn().cursor())
+
+    @contextlib.contextmanager
+    def cursor(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        con = self._cursors.get()
+        try:
+            yield con
+        finally:
+            self._cursors.put(con)
+
+
+_READ_POOL = _Pool(TP_DUCKDB_POOL_SIZE)
+
+# DuckDB allows a single writer; all writes share one cursor behind a lock.
+_WRITER = _conn().cursor()
+_WRITE_LOCK = threading.Lock()
+
+
+@contextlib.contextmanager
+def _writer() -> Iterator[duckdb.DuckDBPyConnection]:
+    with _WRITE_LOCK:
+        yield _WRITER
+
+
+# Column order matches the daily_bars table definition above.
+_BARS_ARROW_SCHEMA = pa.schema(
+    [
+        ("symbol", pa.string()),
+        ("trade_date", pa.date32()),
+        ("open", pa.float64()),
+        ("high", pa.float64()),
+        ("low", pa.float64()),
+        ("close", pa.float64()),
+        ("volume", pa.float64()),
+        ("vwap", pa.float64()),
+        ("turnover", pa.float64()),
+        ("change_pct", pa.float64()),
+        ("adj_open", pa.float64()),
+        ("adj_high", pa.float64()),
+        ("adj_low", pa.float64()),
+        ("adj_close", pa.float64()),
+    ]
+)
+
+
 # ---------------------------------------------------------------------------
 # Hot-path API
 # ---------------------------------------------------------------------------
 
 
-def upsert_daily_bars(symbol: str, bars: Sequence[PriceBarDTO]) -> int:
+def _parse_bar_date(value: str) -> date:
+    """
+    Trade date from a bar's ISO ``time`` string.
+
+    Polygon and EODHD bars always start with ``YYYY-MM-DD``, so slice the
+    date out instead of parsing a full timezone-aware datetime.
+    """
+    return date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+
+
+def _bars_to_arrow(symbol: str, bars: Sequence[PriceBarDTO]) -> pa.Table:
+    """
+    Build an insert batch column-wise, in daily_bars column order.
+
+    DuckDB scans the Arrow table directly; executemany binds every row
+    separately and is far slower.
+    """
+    return pa.Table.from_pydict(
+        {
+            "symbol": [symbol] * len(bars),
+            # Date prefix of the ISO ``time`` strings, sliced and parsed by
+            # Arrow kernels rather than per row in Python.
+            "trade_date": pc.cast(
+                pc.utf8_slice_codeunits(pa.array([b["time"] for b in bars], pa.string()), 0, 10),
+                pa.date32(),
+            ),
+            "open": [b["open"] for b in bars],
+            "high": [b["high"] for b in bars],
+            "low": [b["low"] for b in bars],
+            "close": [b["close"] for b in bars],
+            "volume": [b["volume"] for b in bars],
+            "vwap": [b.get("vwap") for b in bars],
+            "turnover": [b.get("turnover") for b in bars],
+            "change_pct": [b.get("change_pct") for b in bars],
+            "adj_open": [b.get("adj_open", b.get("open")) for b in bars],
+            "adj_high": [b.get("adj_high", b.get("high")) for b in bars],
+            "adj_low": [b.get("adj_low", b.get("low")) for b in bars],
+            "adj_close": [b.get("adj_close", b.get("close")) for b in bars],
+        },
+        schema=_BARS_ARROW_SCHEMA,
+    )
+
+
+def _dedupe_bars(batch: pa.Table) -> pa.Table:
+    """
+    ``batch`` ordered by (symbol, trade_date) with one row per key.
+
+    Providers occasionally repeat a trade date; a repeated key keeps its
+    last row, as the per-row INSERT OR REPLACE used to, instead of failing
+    the plain INSERT on the primary key.
+    """
+    # Arrow's sort is stable, so repeats stay in arrival order.
+    batch = batch.sort_by([("symbol", "ascending"), ("trade_date", "ascending")])
+    if batch.num_rows < 2:
+        return batch
+    symbol = batch.column("symbol")
+    trade_date = batch.column("trade_date")
+    # A row is the last of its key when the next row has a different key.
+    is_last = pc.or_(
+        pc.not_equal(symbol[:-1], symbol[1:]), pc.not_equal(trade_date[:-1], trade_date[1:])
+    )
+    if pc.all(is_last).as_py():
+        return batch
+    return batch.filter(pa.concat_arrays([is_last.combine_chunks(), pa.array([True])]))
+
+
+def _replace_windows(windows: Sequence[Tuple[str, date, date]], chunks: Iterable[pa.Table]) -> None:
+    """
+    In one transaction, clear each (symbol, first_date, last_date) window
+    and append ``chunks`` in its place.
+
+    Callers dedupe first: a (symbol, trade_date) key may appear only once
+    across all chunks.
+    """
+    with _writer() as con:
+        try:
+            con.execute("BEGIN")
+            # Replace the fetched windows wholesale: clearing the ranges
+            # first lets the new rows go in as a plain append, with no
+            # per-row conflict probes against the primary key.
+            for symbol, first_date, last_date in windows:
+                con.execute(
+                    """
+                    DELETE FROM daily_bars
+                    WHERE symbol = ?
+                      AND trade_date BETWEEN ? AND ?
+                    """,
+                    [symbol, first_date, last_date],
+                )
+            for chunk in chunks:
+                con.register("_tmp_bars", chunk)
+                try:
+                    con.execute("INSERT INTO daily_bars SELECT * FROM _tmp_bars")
+                finally:
+                    con.unregister("_tmp_bars")
+            con.execute("COMMIT")
+        except Exception:
+            try:
+                con.execute("ROLLBACK")
+            except Exception:
+                pass
+            raise
+
+
+def upsert_daily_bars(symbol: str, bars: Union[Sequence[PriceBarDTO], pa.Table]) -> int:
+    """
+    Replace the symbol's stored bars over the window ``bars`` covers.
+
+    This is replace-by-window, not a merge: every stored bar dated between
+    the first and last bar in ``bars`` is deleted first, so a partial
+    refetch (a gap inside its range) drops the stored bars for the missing
+    dates. Bars outside the window are untouched.
+
+    ``bars`` is a PriceBarDTO list or an Arrow table in daily_bars column
+    order without ``symbol`` (see fetch_eodhd_daily_table).
+    """
     if not bars:
         return 0
 
-    symbol = symbol.upper()
-    records = []
-
-    for b in bars:
-        dt = datetime.fromisoformat(b["time"])
-        trade_date = dt.date()
-
-        adj_open = b.get("adj_open", b.get("open"))
-        adj_high = b.get("adj_high", b.get("high"))
-        adj_low = b.get("adj_low", b.get("low"))
-        adj_close = b.get("adj_close", b.get("close"))
-
-        records.append(
-            (
-                symbol,
-                trade_date,
-                float(b["open"]),
-                float(b["high"]),
-                float(b["low"]),
-                float(b["close"]),
-                float(b["volume"]),
-                float(b["vwap"]) if b.get("vwap") is not None else None,
-                float(b["turnover"]) if b.get("turnover") is not None else None,
-                float(b["change_pct"]) if b.get("change_pct") is not None else None,
-                float(adj_open) if adj_open is not None else None,
-                float(adj_high) if adj_high is not None else None,
-                float(adj_low) if adj_low is not None else None,
-                float(adj_close) if adj_close is not None else None,
+    # Routes normalize once at the boundary; only allocate when needed.
+    if not symbol.isupper():
+        symbol = symbol.upper()
+
+    if isinstance(bars, pa.Table):
+        return upsert_daily_bar_tables([(symbol, bars)])[symbol]
+
+    # One bar per trade date, last one wins, before chunking: a repeat that
+    # lands in a different chunk would otherwise hit the primary key.
+    by_date = {b["time"][:10]: b for b in bars}
+    if len(by_date) != len(bars):
+        bars = list(by_date.values())
+
+    # Key-ordered batches turn primary-key maintenance into sequential
+    # inserts; provider responses are not guaranteed to arrive sorted.
+    # ISO ``time`` strings sort chronologically, and an already-sorted list
+    # costs a single pass.
+    bars = sorted(bars, key=itemgetter("time"))
+    step = TP_DUCKDB_FLUSH_THRESHOLD
+    # Multi-year backfills are built and flushed in bounded chunks so only
+    # one chunk's Arrow columns are resident at a time.
+    chunks = (
+        _bars_to_arrow(symbol, bars[offset : offset + step]) for offset in range(0, len(bars), step)
+    )
+    window = (symbol, _parse_bar_date(bars[0]["time"]), _parse_bar_date(bars[-1]["time"]))
+    _replace_windows([window], chunks)
+    return len(bars)
+
+
+def upsert_daily_bar_tables(batches: Sequence[Tuple[str, pa.Table]]) -> Dict[str, int]:
+    """
+    Upsert several symbols' Arrow bar tables (as from fetch_eodhd_daily_table)
+    in a single transaction, replacing each symbol's fetched window (the
+    same replace-by-window semantics as upsert_daily_bars).
+
+    A repeated (symbol, trade_date) keeps its last row. Returns rows
+    written, keyed by the symbols as passed in.
+    """
+    windows: List[Tuple[str, date, date]] = []
+    tables: List[pa.Table] = []
+    written: Dict[str, int] = {}
+
+    for key, bars in batches:
+        symbol = key if key.isupper() else key.upper()
+        if bars.num_rows == 0:
+            written[key] = 0
+            continue
+        n = bars.num_rows
+        table = _dedupe_bars(
+            pa.Table.from_arrays(
+                [pa.array([symbol] * n, pa.string())]
+                + [bars.column(name) for name in _BARS_ARROW_SCHEMA.names[1:]],
+                schema=_BARS_ARROW_SCHEMA,
             )
         )
+        written[key] = table.num_rows
+        dates = pc.min_max(table.column("trade_date"))
+        windows.append((symbol, dates["min"].as_py(), dates["max"].as_py()))
+        tables.append(table)
+
+    if not tables:
+        return written
+
+    # Key-ordered batches turn primary-key maintenance into sequential
+    # inserts; provider responses are not guaranteed to arrive sorted.
+    # Deduping the whole batch before slicing also covers a symbol passed
+    # twice (e.g. under different casing).
+    batch = _dedupe_bars(pa.concat_tables(tables))
+    step = TP_DUCKDB_FLUSH_THRESHOLD
+    # Slices are zero-copy views over the already-built table.
+    _replace_windows(windows, (batch.slice(offset, step) for offset in range(0, len(batch), step)))
+    return written
+
+
+# Value columns returned by the bar readers, in daily_bars order.
+_READ_COLUMNS = """
+    trade_date,
+    open,
+    high,
+    low,
+    close,
+    volume,
+    vwap,
+    turnover,
+    change_pct,
+    adj_open,
+    adj_high,
+    adj_low,
+    adj_close
+"""
 
-    con = _get_connection(read_only=False)
-    try:
-        con.execute("BEGIN")
-        con.executemany(
-            """
-            INSERT OR REPLACE INTO daily_bars
-                (symbol, trade_date, open, high, low, close, volume,
-                 vwap, turnover, change_pct, adj_open, adj_high, adj_low, adj_close)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            records,
+
+def read_daily_bars_arrow(symbol: str, start: date, end: date) -> pa.Table:
+    """
+    Stored bars for [start, end] as an Arrow table (trade_date + value
+    columns), for callers that work column-wise and need no DTO dicts.
+    """
+    # Routes normalize once at the boundary; only allocate when needed.
+    if not symbol.isupper():
+        symbol = symbol.upper()
+
+    with _READ_POOL.cursor() as con:
+        # .arrow() is a Table on older duckdb and a RecordBatchReader on
+        # newer releases; pa.table() accepts both.
+        return pa.table(
+            con.execute(
+                f"""
+                SELECT {_READ_COLUMNS}
+                FROM daily_bars
+                WHERE symbol = ?
+                  AND trade_date BETWEEN ? AND ?
+                ORDER BY trade_date
+                """,
+                [symbol, start, end],
+            ).arrow()
         )
-        con.execute("COMMIT")
-    except Exception:
-        try:
-            con.execute("ROLLBACK")
-        except Exception:
-            pass
-        raise
-    finally:
-        con.close()
 
-    return len(records)
+
+def _table_to_dtos(tbl: pa.Table) -> List[PriceBarDTO]:
+    # Format the ISO timestamps column-wise in Arrow instead of building a
+    # date object per row, then let Arrow materialize the dicts. Optional
+    # fields are only present on a bar when they are non-null.
+    tbl = tbl.set_column(
+        0, "time", pc.strftime(tbl.column("trade_date"), "%Y-%m-%dT00:00:00+00:00")
+    )
+    return [{k: v for k, v in row.items() if v is not None} for row in tbl.to_pylist()]
 
 
 def read_daily_bars(symbol: str, start: date, end: date) -> List[PriceBarDTO]:
-    symbol = symbol.upper()
+    return _table_to_dtos(read_daily_bars_arrow(symbol, start, end))
 
-    con = _get_connection(read_only=True)
-    try:
-        rows = con.execute(
-            """
-            SELECT
-                trade_date,
-                open,
-                high,
-                low,
-                close,
-                volume,
-                vwap,
-                turnover,
-                change_pct,
-                adj_open,
-                adj_high,
-                adj_low,
-                adj_close
-            FROM daily_bars
-            WHERE symbol = ?
-              AND trade_date BETWEEN ? AND ?
-            ORDER BY trade_date
-            """,
-            [symbol, start, end],
-        ).fetchall()
-    finally:
-        con.close()
 
-    dto_rows: List[PriceBarDTO] = []
-    for (
-        trade_date,
-        o,
-        h,
-        l,
-        c,
-        v,
-        vwap,
-        turnover,
-        change_pct,
-        adj_open,
-        adj_high,
-        adj_low,
-        adj_close,
-    ) in rows:
-        bar = {
-            "time": f"{trade_date.isoformat()}T00:00:00+00:00",
-            "open": float(o),
-            "high": float(h),
-            "low": float(l),
-            "close": float(c),
-            "volume": float(v),
-        }
-
-        optional_fields = {
-            "vwap": vwap,
-            "turnover": turnover,
-            "change_pct": change_pct,
-            "adj_open": adj_open,
-            "adj_high": adj_high,
-            "adj_low": adj_low,
-            "adj_close": adj_close,
-        }
-
-        for key, val in optional_fields.items():
-            if val is not None:
-                bar[key] = float(val)
-
-        dto_rows.append(PriceBarDTO(**bar))
-
-    return dto_rows
+def read_recent_daily_bars(symbol: str, n: int) -> List[PriceBarDTO]:
+    """
+    The symbol's latest ``n`` stored bars, oldest first.
+
+    Serves the common "last N days" shape with a top-N query instead of a
+    caller-computed date range.
+    """
+    if not symbol.isupper():
+        symbol = symbol.upper()
+
+    with _READ_POOL.cursor() as con:
+        tbl = pa.table(
+            con.execute(
+                f"""
+                SELECT {_READ_COLUMNS}
+                FROM daily_bars
+                WHERE symbol = ?
+                ORDER BY trade_date DESC
+                LIMIT ?
+                """,
+                [symbol, n],
+            ).arrow()
+        )
+
+    return _table_to_dtos(tbl)[::-1]
+
+
+def read_latest_daily_bar(symbol: str) -> Optional[PriceBarDTO]:
+    """
+    The symbol's most recent stored bar, or None if it has none.
+    """
+    bars = read_recent_daily_bars(symbol, 1)
+    return bars[0] if bars else None
 
 
 async def ingest_eodhd_window(symbol: str, start: date, end: date) -> None:
-    _ensure_schema()
-    bars = await fetch_eodhd_daily_ohlcv(symbol=symbol, start=start, end=end)
+    bars = await fetch_eodhd_daily_table(symbol=symbol, start=start, end=end)
     upsert_daily_bars(symbol, bars)
 
 
+async def ingest_eodhd_universe(
+    symbols: Sequence[str],
+    start: date,
+    end: date,
+    *,
+    fetch_concurrency: int = 8,
+) -> Tuple[Dict[str, int], Dict[str, str]]:
+    """
+    Fetch + upsert a window for many symbols with network and DB work overlapped.
+
+    Up to fetch_concurrency EODHD requests run at once and feed a bounded
+    queue; a single consumer upserts the batches from a worker thread, so
+    writes stay serialized and at most _INGEST_QUEUE_SIZE fetched batches
+    (plus one pending commit group) are held in memory.
+
+    Returns (rows written per symbol, error message per failed symbol).
+    """
+    written: Dict[str, int] = {}
+    errors: Dict[str, str] = {}
+
+    pending: asyncio.Queue = asyncio.Queue()
+    for sym in symbols:
+        pending.put_nowait(sym)
+    fetched: asyncio.Queue = asyncio.Queue(maxsize=_INGEST_QUEUE_SIZE)
+
+    async def fetch_worker() -> None:
+        while True:
+            try:
+                sym = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                bars = await fetch_eodhd_daily_table(symbol=sym, start=start, end=end)
+            except Exception as exc:
+                errors[sym] = str(exc)
+                continue
+            await fetched.put((sym, bars))
+
+    async def write_worker() -> None:
+        # Fetched symbols are committed together once about
+        # _INGEST_COMMIT_ROWS rows are pending, rather than one transaction
+        # per symbol. A failed commit fails every symbol in that group.
+        pending_tables: List[Tuple[str, pa.Table]] = []
+        pending_rows = 0
+
+        async def flush() -> None:
+            nonlocal pending_tables, pending_rows
+            group, pending_tables, pending_rows = pending_tables, [], 0
+            if not group:
+                return
+            try:
+                written.update(await asyncio.to_thread(upsert_daily_bar_tables, group))
+            except Exception as exc:
+                for sym, _ in group:
+                    errors[sym] = str(exc)
+
+        while True:
+            item = await fetched.get()
+            if item is None:
+                await flush()
+                return
+            pending_tables.append(item)
+            pending_rows += item[1].num_rows
+            if pending_rows >= _INGEST_COMMIT_ROWS:
+                await flush()
+
+    writer = asyncio.create_task(write_worker())
+    try:
+        await asyncio.gather(
+            *(fetch_worker() for _ in range(max(1, min(fetch_concurrency, len(symbols)))))
+        )
+    finally:
+        await fetched.put(None)
+        await writer
+
+    return written, errors
+
+
 # ---------------------------------------------------------------------------
 # NEW: Archiving / retention
 # ---------------------------------------------------------------------------
@@ -246,47 +559,38 @@ def archive_old_daily_bars(*, cutoff_date: date) -> Dict[str, int]:
     - Uses INSERT OR REPLACE to be idempotent
     - Deletes from hot table after copy
     """
-    _ensure_schema()
-
-    con = _get_connection(read_only=False)
-    try:
-        # Count what will be moved
-        to_move = con.execute(
-            "SELECT COUNT(*) FROM daily_bars WHERE trade_date < ?",
-            [cutoff_date],
-        ).fetchone()[0]
-        to_move = int(to_move or 0)
-
-        if to_move == 0:
-            return {"archived": 0, "deleted_from_hot": 0}
-
-        con.execute("BEGIN")
+    with _writer() as con:
+        try:
+            con.execute("BEGIN")
+
+            # Copy to archive, then delete from hot; both statements filter
+            # on the same predicate, so no separate COUNT pre-scan is needed.
+            # Rows land date-ordered, so the archive's row-group min/max
+            # stats on trade_date let date-range reads skip whole groups.
+            con.execute(
+                """
+                INSERT OR REPLACE INTO daily_bars_archive
+                SELECT *
+                FROM daily_bars
+                WHERE trade_date < ?
+                ORDER BY trade_date, symbol
+                """,
+                [cutoff_date],
+            )
 
-        # Copy to archive
-        con.execute(
-            """
-            INSERT OR REPLACE INTO daily_bars_archive
-            SELECT *
-            FROM daily_bars
-            WHERE trade_date < ?
-            """,
-            [cutoff_date],
-        )
+            # DELETE reports its affected-row count as a one-row result.
+            moved = con.execute(
+                "DELETE FROM daily_bars WHERE trade_date < ?",
+                [cutoff_date],
+            ).fetchone()[0]
 
-        # Delete from hot
-        con.execute(
-            "DELETE FROM daily_bars WHERE trade_date < ?",
-            [cutoff_date],
-        )
-
-        con.execute("COMMIT")
-        return {"archived": to_move, "deleted_from_hot": to_move}
+            con.execute("COMMIT")
+            moved = int(moved or 0)
+            return {"archived": moved, "deleted_from_hot": moved}
 
-    except Exception:
-        try:
-            con.execute("ROLLBACK")
         except Exception:
-            pass
-        raise
-    finally:
-        con.close()
+            try:
+                con.execute("ROLLBACK")
+            except Exception:
+                pass
+            raise
@@ -0,0 +1,44 @@
+# backend/app/datalake/duckdb_settings.py
+
+"""
+DuckDB tuning shared by every long-lived connection in the backend.
+
+These are database-instance settings: DuckDB shares one instance per file
+within a process, so applying them on any connection applies them for all.
+Leave TP_DUCKDB_THREADS / TP_DUCKDB_MEMORY_LIMIT unset to keep DuckDB's
+own defaults (all cores, 80% of RAM); set TP_DUCKDB_CHECKPOINT_THRESHOLD
+to an empty string for DuckDB's default checkpoint threshold.
+"""
+
+import os
+
+import duckdb
+
+TP_DUCKDB_THREADS: str = os.getenv("TP_DUCKDB_THREADS", "").strip()
+TP_DUCKDB_MEMORY_LIMIT: str = os.getenv("TP_DUCKDB_MEMORY_LIMIT", "").strip()
+
+# WAL size that triggers an automatic checkpoint. Ingest issues many small
+# writes; a larger threshold than DuckDB's 16MB default means fewer forced
+# checkpoints in the middle of a run. Empty keeps DuckDB's default.
+TP_DUCKDB_CHECKPOINT_THRESHOLD: str = os.getenv("TP_DUCKDB_CHECKPOINT_THRESHOLD", "1GB").strip()
+
+# Every read we serve has an explicit ORDER BY, so DuckDB is free to
+# parallelize inserts and scans without keeping arrival order.
+TP_DUCKDB_PRESERVE_INSERTION_ORDER: bool = (
+    os.getenv("TP_DUCKDB_PRESERVE_INSERTION_ORDER", "false").strip().lower() == "true"
+)
+
+# Current time as a naive UTC TIMESTAMP, matching what datetime.utcnow()
+# used to bind. Plain NOW() is TIMESTAMPTZ and would be cast through the
+# session time zone when stored in a TIMESTAMP column.
+UTC_NOW_SQL = "(NOW() AT TIME ZONE 'UTC')"
+
+
+def apply_duckdb_settings(con: duckdb.DuckDBPyConnection) -> None:
+    if TP_DUCKDB_THREADS:
+        con.execute(f"SET threads = {int(TP_DUCKDB_THREADS)}")
+    if TP_DUCKDB_MEMORY_LIMIT:
+        con.execute("SET memory_limit = ?", [TP_DUCKDB_MEMORY_LIMIT])
+    if TP_DUCKDB_CHECKPOINT_THRESHOLD:
+        con.execute("SET checkpoint_threshold = ?", [TP_DUCKDB_CHECKPOINT_THRESHOLD])
+    con.execute(f"SET preserve_insertion_order = {str(TP_DUCKDB_PRESERVE_INSERTION_ORDER).lower()}")
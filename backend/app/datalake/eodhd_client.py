@@ -1,10 +1,15 @@
 # backend/app/datalake/eodhd_client.py
 
 import os
+import time
 from datetime import date, datetime, timezone
+from functools import lru_cache
 from typing import List, Optional, TypedDict
 
 import httpx
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
 
 
 class EodhdClientError(Exception):
@@ -39,6 +44,19 @@ class PriceBarDTO(TypedDict, total=False):
     adj_close: float
 
 
+# Optional PriceBarDTO extras: (our key, EODHD key, fallback EODHD key).
+_EXTRA_FIELDS = (
+    ("vwap", "vwap", None),
+    ("turnover", "turnover", None),
+    # EODHD uses change_p for percentage change; fall back to change
+    ("change_pct", "change_p", "change"),
+    ("adj_open", "adjusted_open", None),
+    ("adj_high", "adjusted_high", None),
+    ("adj_low", "adjusted_low", None),
+    # adjusted_close might be named adj_close in some payloads
+    ("adj_close", "adjusted_close", "adj_close"),
+)
+
 EODHD_API_TOKEN = os.getenv("EODHD_API_TOKEN", "").strip()
 
 
@@ -54,6 +72,43 @@ def _ensure_api_token() -> str:
     return EODHD_API_TOKEN
 
 
+@lru_cache(maxsize=1)
+def _get_client() -> httpx.AsyncClient:
+    """
+    Shared HTTP client so per-symbol fetches reuse pooled keep-alive
+    connections (and their TLS sessions) to eodhd.com. HTTP/2 lets
+    concurrent universe fetches multiplex over those connections.
+    """
+    return httpx.AsyncClient(
+        timeout=20.0,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=20),
+    )
+
+
+async def aclose_client() -> None:
+    """Close the shared HTTP client, if one was created."""
+    if _get_client.cache_info().currsize:
+        await _get_client().aclose()
+        _get_client.cache_clear()
+
+
+# [monotonic timestamp, UTC date]; refreshed at most once a minute.
+_TODAY_CACHE: list = [float("-inf"), None]
+
+
+def _utc_today() -> date:
+    """
+    Today's date in UTC, cached for 60 seconds since it's needed on every
+    request but only changes once a day.
+    """
+    now = time.monotonic()
+    if now - _TODAY_CACHE[0] >= 60.0:
+        _TODAY_CACHE[1] = datetime.now(timezone.utc).date()
+        _TODAY_CACHE[0] = now
+    return _TODAY_CACHE[1]
+
+
 def _clamp_dates(
     start: date,
     end: date,
@@ -63,32 +118,21 @@ def _clamp_dates(
     Clamp input dates so we never go into the future, but allow end == today.
     """
     if today is None:
-        today = datetime.now(timezone.utc).date()
+        today = _utc_today()
 
     if start > today:
         raise ValueError("Start date cannot be in the future.")
 
-    if end > today:
-        end = today
-
+    end = min(end, today)
     if end < start:
         raise ValueError("End date cannot be before start date.")
 
     return start, end
 
 
-async def fetch_eodhd_daily_ohlcv(
-    symbol: str,
-    start: date,
-    end: date,
-    exchange: str = "US",
-) -> List[PriceBarDTO]:
+async def _fetch_eod_rows(symbol: str, start: date, end: date, exchange: str) -> list:
     """
-    Fetch daily OHLCV bars from EODHD between [start, end], inclusive.
-
-    Uses /api/eod/<symbol>.<exchange> with from/to params.
-
-    We normalize the result into our PriceBarDTO list.
+    Raw /api/eod/<symbol>.<exchange> rows between [start, end], inclusive.
     """
     api_token = _ensure_api_token()
     start_clamped, end_clamped = _clamp_dates(start, end)
@@ -104,13 +148,12 @@ async def fetch_eodhd_daily_ohlcv(
         "fmt": "json",
     }
 
-    async with httpx.AsyncClient(timeout=20.0) as client:
-        resp = await client.get(f"{base_url}/{full_symbol}", params=params)
+    resp = await _get_client().get(f"{base_url}/{full_symbol}", params=params)
 
     if resp.status_code >= 400:
         raise RuntimeError(f"EODHD HTTP error {resp.status_code}: {resp.text}")
 
-    data = resp.json()
+    data = orjson.loads(resp.content)
 
     # If EODHD returns an error message instead of a list
     if isinstance(data, dict) and data.get("code") and data.get("message"):
@@ -120,38 +163,43 @@ async def fetch_eodhd_daily_ohlcv(
         # Be defensive; we'll just return empty
         return []
 
+    return data
+
+
+async def fetch_eodhd_daily_ohlcv(
+    symbol: str,
+    start: date,
+    end: date,
+    exchange: str = "US",
+) -> List[PriceBarDTO]:
+    """
+    Fetch daily OHLCV bars from EODHD between [start, end], inclusive.
+
+    Uses /api/eod/<symbol>.<exchange> with from/to params.
+
+    We normalize the result into our PriceBarDTO list.
+    """
+    return _rows_to_dtos(await _fetch_eod_rows(symbol, start, end, exchange))
+
+
+def _rows_to_dtos(data: list) -> List[PriceBarDTO]:
     bars: List[PriceBarDTO] = []
+    append = bars.append
+    extra_fields = _EXTRA_FIELDS
 
     for row in data:
+        get = row.get
         # Expected keys: date, open, high, low, close, volume
-        d = row.get("date")
-        o = row.get("open")
-        h = row.get("high")
-        l = row.get("low")
-        c = row.get("close")
-        v = row.get("volume")
-
-        if not d or any(val is None for val in (o, h, l, c, v)):
+        d = get("date")
+        o = get("open")
+        h = get("high")
+        l = get("low")
+        c = get("close")
+        v = get("volume")
+
+        if not d or None in (o, h, l, c, v):
             continue
 
-        extras = {
-            "vwap": row.get("vwap"),
-            "turnover": row.get("turnover"),
-            # EODHD uses change_p for percentage change; fall back to change
-            "change_pct": (
-                row.get("change_p") if row.get("change_p") is not None else row.get("change")
-            ),
-            "adj_open": row.get("adjusted_open"),
-            "adj_high": row.get("adjusted_high"),
-            "adj_low": row.get("adjusted_low"),
-            # adjusted_close might be named adj_close in some payloads
-            "adj_close": (
-                row.get("adjusted_close")
-                if row.get("adjusted_close") is not None
-                else row.get("adj_close")
-            ),
-        }
-
         # Keep it simple: date-only ISO, treat as UTC midnight
         bar: PriceBarDTO = {
             "time": f"{d}T00:00:00+00:00",
@@ -163,10 +211,92 @@ async def fetch_eodhd_daily_ohlcv(
         }
 
         # Attach optional extras if present (skip None values)
-        for key, val in extras.items():
+        for key, src, fallback in extra_fields:
+            val = get(src)
+            if val is None and fallback is not None:
+                val = get(fallback)
             if val is not None:
                 bar[key] = float(val)
 
-        bars.append(PriceBarDTO(**bar))
+        append(bar)
 
     return bars
+
+
+# ---------------------------------------------------------------------------
+# Arrow ingest path
+# ---------------------------------------------------------------------------
+
+# Raw /eod row layout. Ints are widened and absent keys become nulls while
+# Arrow converts the whole payload in one call.
+_RAW_ARROW_SCHEMA = pa.schema(
+    [("date", pa.string())]
+    + [(k, pa.float64()) for k in ("open", "high", "low", "close", "volume")]
+    + [(k, pa.float64()) for _, src, fb in _EXTRA_FIELDS for k in (src, fb) if k is not None]
+)
+
+
+def _rows_to_table(data: list) -> pa.Table:
+    """
+    Columnar equivalent of _rows_to_dtos, in daily_bars column order
+    (without symbol).
+
+    Adjusted prices default to their raw counterparts, as upsert_daily_bars
+    does for DTOs. Payloads Arrow cannot coerce (e.g. numeric strings) go
+    through the row normalizer instead.
+    """
+    try:
+        raw = pa.Table.from_pylist(data, schema=_RAW_ARROW_SCHEMA)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return _dtos_to_table(_rows_to_dtos(data))
+
+    # Same skip rule as _rows_to_dtos: a date and all of OHLCV present.
+    keep = pc.fill_null(pc.not_equal(raw["date"], ""), False)
+    for key in ("open", "high", "low", "close", "volume"):
+        keep = pc.and_(keep, pc.is_valid(raw[key]))
+    raw = raw.filter(keep)
+
+    cols = {
+        "trade_date": pc.cast(raw["date"], pa.date32()),
+        "open": raw["open"],
+        "high": raw["high"],
+        "low": raw["low"],
+        "close": raw["close"],
+        "volume": raw["volume"],
+    }
+    for key, src, fallback in _EXTRA_FIELDS:
+        cols[key] = raw[src] if fallback is None else pc.coalesce(raw[src], raw[fallback])
+    return _with_adjusted_defaults(cols)
+
+
+def _dtos_to_table(bars: List[PriceBarDTO]) -> pa.Table:
+    cols = {
+        "trade_date": pc.cast(
+            pc.utf8_slice_codeunits(pa.array([b["time"] for b in bars], pa.string()), 0, 10),
+            pa.date32(),
+        )
+    }
+    for key in ("open", "high", "low", "close", "volume"):
+        cols[key] = pa.array([b[key] for b in bars], pa.float64())
+    for key, _, _ in _EXTRA_FIELDS:
+        cols[key] = pa.array([b.get(key) for b in bars], pa.float64())
+    return _with_adjusted_defaults(cols)
+
+
+def _with_adjusted_defaults(cols: dict) -> pa.Table:
+    for key in ("open", "high", "low", "close"):
+        cols[f"adj_{key}"] = pc.coalesce(cols[f"adj_{key}"], cols[key])
+    return pa.table(cols)
+
+
+async def fetch_eodhd_daily_table(
+    symbol: str,
+    start: date,
+    end: date,
+    exchange: str = "US",
+) -> pa.Table:
+    """
+    Like fetch_eodhd_daily_ohlcv, but returns an Arrow table ready for
+    upsert_daily_bars, skipping the per-row dict intermediate.
+    """
+    return _rows_to_table(await _fetch_eod_rows(symbol, start, end, exchange))
@@ -2,18 +2,47 @@
 
 from __future__ import annotations
 
+import atexit
+import functools
 import os
-from datetime import date, datetime, timedelta
+import threading
+from datetime import date
 from typing import Dict, List, Optional, Tuple
 
 import duckdb
+import pyarrow as pa
+from app.datalake.duckdb_settings import UTC_NOW_SQL, apply_duckdb_settings
 
 TP_DUCKDB_PATH = os.getenv("TP_DUCKDB_PATH", "/data/tradepopping.duckdb")
 TABLE = "eodhd_ingest_queue"
 
 
+@functools.lru_cache(maxsize=1)
+def _conn() -> duckdb.DuckDBPyConnection:
+    """
+    Process-wide DuckDB connection, opened once on first use.
+    """
+    con = duckdb.connect(TP_DUCKDB_PATH)
+    apply_duckdb_settings(con)
+    atexit.register(con.close)
+    return con
+
+
+_LOCAL = threading.local()
+
+
 def _get_conn() -> duckdb.DuckDBPyConnection:
-    return duckdb.connect(TP_DUCKDB_PATH)
+    """
+    This thread's cursor on the shared connection, created on first use.
+
+    Opening a fresh cursor per call costs more than the small queue
+    statements it runs (duckdb issue 13036), so each thread keeps one and
+    callers never close it. A cursor must not be shared across threads.
+    """
+    con = getattr(_LOCAL, "con", None)
+    if con is None:
+        con = _LOCAL.con = _conn().cursor()
+    return con
 
 
 def ensure_schema() -> None:
@@ -24,82 +53,89 @@ def ensure_schema() -> None:
       - created_at TIMESTAMP (for debugging / audit)
     """
     con = _get_conn()
-    try:
-        con.execute(
-            f"""
-            CREATE TABLE IF NOT EXISTS {TABLE} (
-                job_id TEXT NOT NULL,
-                symbol TEXT NOT NULL,
-                window_start DATE NOT NULL,
-                window_end DATE NOT NULL,
-
-                state TEXT NOT NULL, -- 'pending' | 'running' | 'succeeded' | 'failed'
-                attempts INTEGER NOT NULL,
-                created_at TIMESTAMP,
-                last_attempt_at TIMESTAMP,
-                last_error TEXT,
-
-                PRIMARY KEY (job_id, symbol, window_start, window_end)
-            )
-            """
+    con.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {TABLE} (
+            job_id TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            window_start DATE NOT NULL,
+            window_end DATE NOT NULL,
+
+            state TEXT NOT NULL, -- 'pending' | 'running' | 'succeeded' | 'failed'
+            attempts INTEGER NOT NULL,
+            created_at TIMESTAMP,
+            last_attempt_at TIMESTAMP,
+            last_error TEXT,
+
+            PRIMARY KEY (job_id, symbol, window_start, window_end)
         )
-
-        # Forward-migrate: created_at column (if table existed previously without it)
-        cols = con.execute(
-            f"""
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_name = '{TABLE}'
-            """
-        ).fetchall()
-        col_names = {c[0] for c in cols}
-
-        if "created_at" not in col_names:
-            con.execute(f"ALTER TABLE {TABLE} ADD COLUMN created_at TIMESTAMP")
-            # backfill best-effort
-            con.execute(f"UPDATE {TABLE} SET created_at = NOW() WHERE created_at IS NULL")
-
-    finally:
-        con.close()
-
-
+        """
+    )
+
+    # Forward-migrate: created_at column (if table existed previously without it)
+    cols = con.execute(
+        f"""
+        SELECT column_name
+        FROM information_schema.columns
+        WHERE table_name = '{TABLE}'
+        """
+    ).fetchall()
+    col_names = {c[0] for c in cols}
+
+    if "created_at" not in col_names:
+        con.execute(f"ALTER TABLE {TABLE} ADD COLUMN created_at TIMESTAMP")
+        # backfill best-effort
+        con.execute(f"UPDATE {TABLE} SET created_at = NOW() WHERE created_at IS NULL")
+
+
+# Tables are created / migrated once at import; the functions below assume they exist.
 ensure_schema()
 
 
 def enqueue(*, job_id: str, items: List[Tuple[str, date, date]]) -> int:
     """
     Insert queue items. Ignores duplicates by primary key.
+
+    Returns the number of items actually inserted: duplicates within
+    ``items`` and keys already queued for the job are not counted.
     """
     if not items:
         return 0
 
-    ensure_schema()
+    # De-duplicate client-side so the batch never carries the same key
+    # twice; older DuckDB releases abort on in-batch conflicts.
+    unique = dict.fromkeys((sym.upper(), ws, we) for sym, ws, we in items)
+
+    # One columnar batch and a single set-based INSERT instead of a
+    # statement per item; a single statement is atomic on its own.
+    symbols, starts, ends = zip(*unique)
+    batch = pa.table(
+        {
+            "symbol": pa.array(symbols, pa.string()),
+            "window_start": pa.array(starts, pa.date32()),
+            "window_end": pa.array(ends, pa.date32()),
+        }
+    )
+
     con = _get_conn()
     try:
-        con.execute("BEGIN")
-        now = datetime.utcnow()
-
-        for sym, ws, we in items:
-            con.execute(
-                f"""
-                INSERT OR IGNORE INTO {TABLE}
-                (job_id, symbol, window_start, window_end, state, attempts, created_at, last_attempt_at, last_error)
-                VALUES (?, ?, ?, ?, 'pending', 0, ?, NULL, NULL)
-                """,
-                [job_id, sym.upper(), ws, we, now],
-            )
-
-        con.execute("COMMIT")
-    except Exception:
-        try:
-            con.execute("ROLLBACK")
-        except Exception:
-            pass
-        raise
+        con.register("_tmp_queue", batch)
+        # RETURNING only yields the rows the conflict clause let through.
+        inserted = con.execute(
+            f"""
+            INSERT INTO {TABLE}
+            (job_id, symbol, window_start, window_end, state, attempts, created_at, last_attempt_at, last_error)
+            SELECT ?, symbol, window_start, window_end, 'pending', 0, {UTC_NOW_SQL}, NULL, NULL
+            FROM _tmp_queue
+            ON CONFLICT DO NOTHING
+            RETURNING 1
+            """,
+            [job_id],
+        ).fetchall()
     finally:
-        con.close()
+        con.unregister("_tmp_queue")
 
-    return len(items)
+    return len(inserted)
 
 
 def reset_stale_running_to_pending(job_id: str, *, stale_minutes: int = 10) -> int:
@@ -107,148 +143,172 @@ def reset_stale_running_to_pending(job_id: str, *, stale_minutes: int = 10) -> i
     If a worker crashed, 'running' items can be stranded.
     Only reset 'running' items that have been running longer than stale_minutes.
     """
-    ensure_schema()
     con = _get_conn()
-    try:
-        cutoff = datetime.utcnow() - timedelta(minutes=int(stale_minutes))
-
-        con.execute(
-            f"""
-            UPDATE {TABLE}
-            SET state = 'pending'
-            WHERE job_id = ?
-              AND state = 'running'
-              AND (
-                last_attempt_at IS NULL
-                OR last_attempt_at < ?
-              )
-            """,
-            [job_id, cutoff],
-        )
-
-        # DuckDB may not reliably return rowcount; return 0 for now
-        return 0
-    finally:
-        con.close()
-
-
-def pop_next(*, job_id: str, max_attempts: int = 5) -> Optional[Dict[str, object]]:
+    # RETURNING gives an authoritative count of the items reset.
+    reset = con.execute(
+        f"""
+        UPDATE {TABLE}
+        SET state = 'pending'
+        WHERE job_id = ?
+          AND state = 'running'
+          AND (
+            last_attempt_at IS NULL
+            OR last_attempt_at < {UTC_NOW_SQL} - to_minutes(?)
+          )
+        RETURNING 1
+        """,
+        [job_id, int(stale_minutes)],
+    ).fetchall()
+
+    return len(reset)
+
+
+def pop_batch(
+    *, job_id: str, batch_size: int = 64, max_attempts: int = 5
+) -> List[Dict[str, object]]:
     """
-    Get next pending/failed item and mark it running.
+    Claim up to batch_size pending/failed items and mark them running.
+
+    One UPDATE ... RETURNING statement (and so one transaction) per batch,
+    instead of a SELECT + UPDATE transaction per item. Pending items are
+    claimed before failed retries, fewest attempts first.
 
     NOTE: assumes single worker per job (good for now).
     """
-    ensure_schema()
     con = _get_conn()
-    try:
-        con.execute("BEGIN")
-
-        row = con.execute(
-            f"""
-            SELECT symbol, window_start, window_end, attempts
-            FROM {TABLE}
-            WHERE job_id = ?
-              AND state IN ('pending', 'failed')
-              AND attempts < ?
-            ORDER BY
-              CASE WHEN state = 'pending' THEN 0 ELSE 1 END,
-              attempts ASC,
-              symbol ASC
-            LIMIT 1
-            """,
-            [job_id, int(max_attempts)],
-        ).fetchone()
-
-        if row is None:
-            con.execute("COMMIT")
-            return None
-
-        symbol, ws, we, attempts = row
-        now = datetime.utcnow()
-
-        con.execute(
-            f"""
-            UPDATE {TABLE}
-            SET
-              state = 'running',
-              attempts = ?,
-              last_attempt_at = ?,
-              last_error = NULL
-            WHERE job_id = ?
-              AND symbol = ?
-              AND window_start = ?
-              AND window_end = ?
-            """,
-            [int(attempts) + 1, now, job_id, symbol, ws, we],
+    rows = con.execute(
+        f"""
+        UPDATE {TABLE}
+        SET
+          state = 'running',
+          attempts = attempts + 1,
+          last_attempt_at = {UTC_NOW_SQL},
+          last_error = NULL
+        WHERE (job_id, symbol, window_start, window_end) IN (
+          SELECT job_id, symbol, window_start, window_end
+          FROM {TABLE}
+          WHERE job_id = ?
+            AND state IN ('pending', 'failed')
+            AND attempts < ?
+          ORDER BY
+            CASE WHEN state = 'pending' THEN 0 ELSE 1 END,
+            attempts ASC,
+            symbol ASC
+          LIMIT ?
         )
-
-        con.execute("COMMIT")
-
-        return {
+        RETURNING symbol, window_start, window_end, attempts
+        """,
+        [job_id, int(max_attempts), int(batch_size)],
+    ).fetchall()
+
+    # RETURNING order is unspecified; sort for a deterministic hand-out
+    # order (fewest attempts, then symbol). This is not the claim
+    # priority above: pending vs failed is not visible here.
+    rows.sort(key=lambda r: (r[3], r[0]))
+    return [
+        {
             "symbol": str(symbol),
             "window_start": ws,
             "window_end": we,
-            "attempts": int(attempts) + 1,
+            "attempts": int(attempts),
         }
+        for symbol, ws, we, attempts in rows
+    ]
 
-    except Exception:
-        try:
-            con.execute("ROLLBACK")
-        except Exception:
-            pass
-        raise
-    finally:
-        con.close()
+
+def pop_next(*, job_id: str, max_attempts: int = 5) -> Optional[Dict[str, object]]:
+    """
+    Get next pending/failed item and mark it running.
+    """
+    items = pop_batch(job_id=job_id, batch_size=1, max_attempts=max_attempts)
+    return items[0] if items else None
 
 
 def mark_succeeded(job_id: str, symbol: str, ws: date, we: date) -> None:
     con = _get_conn()
-    try:
-        con.execute(
-            f"""
-            UPDATE {TABLE}
-            SET state='succeeded', last_error=NULL
-            WHERE job_id = ? AND symbol = ? AND window_start = ? AND window_end = ?
-            """,
-            [job_id, symbol.upper(), ws, we],
-        )
-    finally:
-        con.close()
+    con.execute(
+        f"""
+        UPDATE {TABLE}
+        SET state='succeeded', last_error=NULL
+        WHERE job_id = ? AND symbol = ? AND window_start = ? AND window_end = ?
+        """,
+        [job_id, symbol.upper(), ws, we],
+    )
 
 
 def mark_failed(job_id: str, symbol: str, ws: date, we: date, err: str) -> None:
+    con = _get_conn()
+    con.execute(
+        f"""
+        UPDATE {TABLE}
+        SET state='failed', last_error=?
+        WHERE job_id = ? AND symbol = ? AND window_start = ? AND window_end = ?
+        """,
+        [err[:500], job_id, symbol.upper(), ws, we],
+    )
+
+
+def mark_batch(job_id: str, outcomes: List[Tuple[str, date, date, Optional[str]]]) -> None:
+    """
+    Record terminal outcomes for many items with one UPDATE ... FROM.
+
+    Each outcome is (symbol, window_start, window_end, error); error None
+    marks the item succeeded, anything else marks it failed.
+    """
+    if not outcomes:
+        return
+
+    symbols, starts, ends, errs = zip(*outcomes)
+    batch = pa.table(
+        {
+            "symbol": pa.array([s.upper() for s in symbols], pa.string()),
+            "window_start": pa.array(starts, pa.date32()),
+            "window_end": pa.array(ends, pa.date32()),
+            "state": pa.array(["succeeded" if e is None else "failed" for e in errs], pa.string()),
+            "last_error": pa.array([None if e is None else e[:500] for e in errs], pa.string()),
+        }
+    )
+
     con = _get_conn()
     try:
+        con.register("_tmp_outcomes", batch)
         con.execute(
             f"""
-            UPDATE {TABLE}
-            SET state='failed', last_error=?
-            WHERE job_id = ? AND symbol = ? AND window_start = ? AND window_end = ?
+            UPDATE {TABLE} AS q
+            SET state = o.state, last_error = o.last_error
+            FROM _tmp_outcomes AS o
+            WHERE q.job_id = ?
+              AND q.symbol = o.symbol
+              AND q.window_start = o.window_start
+              AND q.window_end = o.window_end
             """,
-            [err[:500], job_id, symbol.upper(), ws, we],
+            [job_id],
         )
     finally:
-        con.close()
+        con.unregister("_tmp_outcomes")
 
 
 def get_counts(job_id: str) -> Dict[str, int]:
     con = _get_conn()
-    try:
-        rows = con.execute(
-            f"""
-            SELECT state, COUNT(*)::INTEGER
-            FROM {TABLE}
-            WHERE job_id = ?
-            GROUP BY state
-            """,
-            [job_id],
-        ).fetchall()
-    finally:
-        con.close()
-
-    out = {"pending": 0, "running": 0, "succeeded": 0, "failed": 0, "total": 0}
-    for state, cnt in rows:
-        if state in out:
-            out[state] = int(cnt)
-        out["total"] += int(cnt)
-    return out
+    # Filtered aggregates: one scan, one row, zeros for absent states.
+    pending, running, succeeded, failed, total = con.execute(
+        f"""
+        SELECT
+            COUNT(*) FILTER (WHERE state = 'pending')::INTEGER,
+            COUNT(*) FILTER (WHERE state = 'running')::INTEGER,
+            COUNT(*) FILTER (WHERE state = 'succeeded')::INTEGER,
+            COUNT(*) FILTER (WHERE state = 'failed')::INTEGER,
+            COUNT(*)::INTEGER
+        FROM {TABLE}
+        WHERE job_id = ?
+        """,
+        [job_id],
+    ).fetchone()
+
+    return {
+        "pending": pending,
+        "running": running,
+        "succeeded": succeeded,
+        "failed": failed,
+        "total": total,
+    }
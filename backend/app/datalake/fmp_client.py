@@ -1,9 +1,12 @@
 # backend/app/datalake/fmp_client.py
 
 import os
-from typing import List, Optional, TypedDict
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, TypedDict
 
 import httpx
+import orjson
 
 # Hard allow-list: we only keep these exchanges, even if FMP returns more.
 ALLOWED_EXCHANGES = {"NYSE", "NASDAQ"}
@@ -44,6 +47,65 @@ def _ensure_api_key() -> str:
     return FMP_API_KEY
 
 
+_SCREENER_URL = "https://financialmodelingprep.com/stable/company-screener"
+
+
+@lru_cache(maxsize=1)
+def _base_params() -> Dict[str, str]:
+    """
+    Query params shared by every screener call, built on first use.
+
+    The key check still happens lazily so importing this module works
+    without FMP configured; a failed check is not cached and re-raises.
+    Callers merge per-request params into a copy.
+    """
+    return {"apikey": _ensure_api_key()}
+
+
+@lru_cache(maxsize=1)
+def _get_client() -> httpx.AsyncClient:
+    """
+    Shared HTTP client so repeated screener calls reuse pooled keep-alive
+    connections (and their TLS sessions) to financialmodelingprep.com.
+    HTTP/2 lets related FMP requests multiplex over one connection, so a
+    small keep-alive pool is enough.
+    """
+    return httpx.AsyncClient(
+        timeout=30.0,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=16),
+    )
+
+
+async def aclose_client() -> None:
+    """Close the shared HTTP client, if one was created."""
+    if _get_client.cache_info().currsize:
+        await _get_client().aclose()
+        _get_client.cache_clear()
+
+
+# Screener responses keyed by request parameters:
+# key -> (monotonic fetch time, ETag, Last-Modified, normalized rows).
+# The universe is near-static intraday, so fresh entries are served without
+# a request and stale ones are revalidated with a conditional GET.
+_UNIVERSE_CACHE_TTL = 900.0
+_UNIVERSE_CACHE_SIZE = 32
+_UNIVERSE_CACHE: Dict[tuple, Tuple[float, Optional[str], Optional[str], List[FmpSymbolDTO]]] = {}
+
+
+def _cache_universe(
+    key: tuple,
+    rows: List[FmpSymbolDTO],
+    etag: Optional[str],
+    last_modified: Optional[str],
+) -> None:
+    _UNIVERSE_CACHE.pop(key, None)
+    if len(_UNIVERSE_CACHE) >= _UNIVERSE_CACHE_SIZE:
+        # Dicts keep insertion order, so the first key is the oldest entry.
+        del _UNIVERSE_CACHE[next(iter(_UNIVERSE_CACHE))]
+    _UNIVERSE_CACHE[key] = (time.monotonic(), etag, last_modified, rows)
+
+
 async def fetch_fmp_symbol_universe(
     min_market_cap: int = 50_000_000,  # 50M default floor
     max_market_cap: Optional[int] = None,
@@ -60,78 +122,107 @@ async def fetch_fmp_symbol_universe(
       /stable/company-screener?exchange=NYSE,NASDAQ&marketCapMoreThan=...&apikey=...
 
     We normalize into FmpSymbolDTO and additionally enforce ALLOWED_EXCHANGES.
+
+    Results are cached per parameter set for _UNIVERSE_CACHE_TTL seconds;
+    after that the cached rows are revalidated via ETag / Last-Modified, so
+    an unchanged universe costs a 304 instead of a full download. Callers
+    get fresh row dicts each time and may mutate them; the cache keeps its
+    own.
     """
-    api_key = _ensure_api_key()
+    base_params = _base_params()
 
-    base_url = "https://financialmodelingprep.com/stable/company-screener"
+    key = (min_market_cap, max_market_cap, exchanges, limit, include_etfs, active_only)
+    cached = _UNIVERSE_CACHE.get(key)
+    if cached is not None and time.monotonic() - cached[0] < _UNIVERSE_CACHE_TTL:
+        return [dict(r) for r in cached[3]]
 
     params = {
+        **base_params,
         "exchange": exchanges,
         "marketCapMoreThan": str(min_market_cap),
         "limit": str(limit),
-        "apikey": api_key,
     }
 
     if max_market_cap is not None:
         params["marketCapLowerThan"] = str(max_market_cap)
 
-    # These flags map to the newer screener filters
-    if include_etfs:
-        # "Include ETFs" => don't filter at API level;
-        # we'll keep the flag in the DTO and you can filter later.
-        pass
-    else:
+    # These flags map to the newer screener filters. With include_etfs we
+    # don't filter at API level; the flag stays in the DTO for later.
+    if not include_etfs:
         # Ask FMP to filter out ETFs if supported
         params["isEtf"] = "false"
 
     if active_only:
         params["isActivelyTrading"] = "true"
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.get(base_url, params=params)
+    headers = {}
+    if cached is not None:
+        if cached[1]:
+            headers["If-None-Match"] = cached[1]
+        if cached[2]:
+            headers["If-Modified-Since"] = cached[2]
+
+    resp = await _get_client().get(_SCREENER_URL, params=params, headers=headers)
+
+    if resp.status_code == 304 and cached is not None:
+        # A 304 may omit the validators; keep the ones we already have.
+        _cache_universe(
+            key,
+            cached[3],
+            resp.headers.get("etag", cached[1]),
+            resp.headers.get("last-modified", cached[2]),
+        )
+        return [dict(r) for r in cached[3]]
 
     if resp.status_code >= 400:
         raise RuntimeError(f"FMP HTTP error {resp.status_code}: {resp.text}")
 
-    data = resp.json()
+    data = orjson.loads(resp.content)
     if not isinstance(data, list):
         # Be defensive
         raise FmpClientError(f"Unexpected FMP response: {data!r}")
 
+    out = _rows_to_symbols(data)
+    _cache_universe(key, out, resp.headers.get("etag"), resp.headers.get("last-modified"))
+    return [dict(r) for r in out]
+
+
+def _rows_to_symbols(data: list) -> List[FmpSymbolDTO]:
     out: List[FmpSymbolDTO] = []
+    append = out.append
+    allowed = ALLOWED_EXCHANGES
 
     for row in data:
-        symbol = (row.get("symbol") or "").strip().upper()
-        name = (row.get("companyName") or row.get("company_name") or "").strip()
-
-        # FMP can use either "exchangeShortName" or "exchange"
-        exchange_raw = row.get("exchangeShortName") or row.get("exchange") or ""
-        exchange = exchange_raw.strip().upper()
+        get = row.get
 
-        # 🔒 Hard filter: keep only pure NYSE / NASDAQ rows
-        if exchange not in ALLOWED_EXCHANGES:
+        # FMP can use either "exchangeShortName" or "exchange".
+        # 🔒 Hard filter first: keep only pure NYSE / NASDAQ rows, so dropped
+        # rows skip the rest of the normalization.
+        exchange = (get("exchangeShortName") or get("exchange") or "").strip().upper()
+        if exchange not in allowed:
             continue
 
-        sector = (row.get("sector") or None) or None
-        industry = (row.get("industry") or None) or None
-        market_cap = row.get("marketCap")
-        price = row.get("price")
+        symbol = (get("symbol") or "").strip().upper()
+        market_cap = get("marketCap")
+        price = get("price")
 
         if not symbol or market_cap is None or price is None:
             continue
 
-        out.append(
-            FmpSymbolDTO(
-                symbol=symbol,
-                name=name or symbol,
-                exchange=exchange or "UNKNOWN",
-                sector=sector,
-                industry=industry,
-                market_cap=float(market_cap),
-                price=float(price),
-                is_etf=bool(row.get("isEtf", False)),
-                is_actively_trading=bool(row.get("isActivelyTrading", True)),
-            )
+        name = (get("companyName") or get("company_name") or "").strip()
+
+        append(
+            {
+                "symbol": symbol,
+                "name": name or symbol,
+                "exchange": exchange,
+                "sector": get("sector") or None,
+                "industry": get("industry") or None,
+                "market_cap": float(market_cap),
+                "price": float(price),
+                "is_etf": bool(get("isEtf", False)),
+                "is_actively_trading": bool(get("isActivelyTrading", True)),
+            }
         )
 
     return out
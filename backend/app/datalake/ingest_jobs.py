@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import atexit
+import functools
 import os
-import uuid
-from datetime import date, datetime
-from typing import Any, Dict, List, Literal, Optional
+import threading
+from datetime import date
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
 import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
+from app.datalake.duckdb_settings import UTC_NOW_SQL, apply_duckdb_settings
 
 TP_DUCKDB_PATH = os.getenv("TP_DUCKDB_PATH", "/data/tradepopping.duckdb")
 
@@ -17,56 +22,88 @@ ITEMS_TABLE = "eodhd_ingest_job_items"
 ItemState = Literal["pending", "running", "succeeded", "failed"]
 
 
+@functools.lru_cache(maxsize=1)
+def _conn() -> duckdb.DuckDBPyConnection:
+    """
+    Process-wide DuckDB connection, opened once on first use.
+    """
+    con = duckdb.connect(TP_DUCKDB_PATH)
+    apply_duckdb_settings(con)
+    atexit.register(con.close)
+    return con
+
+
+_LOCAL = threading.local()
+
+
 def _get_conn() -> duckdb.DuckDBPyConnection:
-    return duckdb.connect(TP_DUCKDB_PATH)
+    """
+    This thread's cursor on the shared connection, created on first use
+    and never closed by callers (same pattern as eodhd_queue).
+    """
+    con = getattr(_LOCAL, "con", None)
+    if con is None:
+        con = _LOCAL.con = _conn().cursor()
+    return con
+
+
+# get_job_progress results per job, tagged with the job's revision. Every
+# write to a job or its items through this module bumps the revision once
+# the statement has run, so UI polling between writes is answered from
+# memory. A read is only cached if the revision did not move while it ran,
+# so a result computed before a write is never served after it.
+_PROGRESS_REV: Dict[str, int] = {}
+_PROGRESS_CACHE: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+
+def _touch_job(job_id: str) -> None:
+    _PROGRESS_REV[job_id] = _PROGRESS_REV.get(job_id, 0) + 1
 
 
 def _ensure_schema() -> None:
     con = _get_conn()
-    try:
-        con.execute(
-            f"""
-            CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
-                id TEXT PRIMARY KEY,
-                created_at TIMESTAMP NOT NULL,
-                started_at TIMESTAMP,
-                finished_at TIMESTAMP,
-                state TEXT NOT NULL, -- 'running' | 'succeeded' | 'failed'
-
-                requested_start DATE NOT NULL,
-                requested_end DATE NOT NULL,
-                universe_symbols_considered INTEGER NOT NULL,
-
-                symbols_attempted INTEGER NOT NULL,
-                symbols_succeeded INTEGER NOT NULL,
-                symbols_failed INTEGER NOT NULL,
-
-                last_error TEXT
-            )
-            """
+    con.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+            id TEXT PRIMARY KEY,
+            created_at TIMESTAMP NOT NULL,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP,
+            state TEXT NOT NULL, -- 'running' | 'succeeded' | 'failed'
+
+            requested_start DATE NOT NULL,
+            requested_end DATE NOT NULL,
+            universe_symbols_considered INTEGER NOT NULL,
+
+            symbols_attempted INTEGER NOT NULL,
+            symbols_succeeded INTEGER NOT NULL,
+            symbols_failed INTEGER NOT NULL,
+
+            last_error TEXT
         )
+        """
+    )
 
-        # NEW: per-symbol items so we can resume + show real progress
-        con.execute(
-            f"""
-            CREATE TABLE IF NOT EXISTS {ITEMS_TABLE} (
-                job_id TEXT NOT NULL,
-                symbol TEXT NOT NULL,
+    # NEW: per-symbol items so we can resume + show real progress
+    con.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {ITEMS_TABLE} (
+            job_id TEXT NOT NULL,
+            symbol TEXT NOT NULL,
 
-                state TEXT NOT NULL, -- 'pending' | 'running' | 'succeeded' | 'failed'
-                attempts INTEGER NOT NULL,
-                last_error TEXT,
+            state TEXT NOT NULL, -- 'pending' | 'running' | 'succeeded' | 'failed'
+            attempts INTEGER NOT NULL,
+            last_error TEXT,
 
-                updated_at TIMESTAMP NOT NULL,
+            updated_at TIMESTAMP NOT NULL,
 
-                PRIMARY KEY (job_id, symbol)
-            )
-            """
+            PRIMARY KEY (job_id, symbol)
         )
-    finally:
-        con.close()
+        """
+    )
 
 
+# Tables are created / migrated once at import; the functions below assume they exist.
 _ensure_schema()
 
 
@@ -85,51 +122,86 @@ def create_ingest_job(
     symbols_failed: int = 0,
     last_error: Optional[str] = None,
 ) -> str:
-    _ensure_schema()
-    job_id = str(uuid.uuid4())
-    now = datetime.utcnow()
-
+    # DuckDB generates the id; RETURNING hands it back as text.
     con = _get_conn()
-    try:
-        con.execute(
-            f"""
-            INSERT INTO {TABLE_NAME} (
-                id,
-                created_at,
-                started_at,
-                finished_at,
-                state,
-                requested_start,
-                requested_end,
-                universe_symbols_considered,
-                symbols_attempted,
-                symbols_succeeded,
-                symbols_failed,
-                last_error
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            [
-                job_id,
-                now,
-                now,
-                None,
-                "running",
-                requested_start,
-                requested_end,
-                int(universe_symbols_considered),
-                int(symbols_attempted),
-                int(symbols_succeeded),
-                int(symbols_failed),
-                last_error,
-            ],
+    (job_id,) = con.execute(
+        f"""
+        INSERT INTO {TABLE_NAME} (
+            id,
+            created_at,
+            started_at,
+            finished_at,
+            state,
+            requested_start,
+            requested_end,
+            universe_symbols_considered,
+            symbols_attempted,
+            symbols_succeeded,
+            symbols_failed,
+            last_error
         )
-    finally:
-        con.close()
+        VALUES (uuid(), {UTC_NOW_SQL}, {UTC_NOW_SQL}, NULL, ?, ?, ?, ?, ?, ?, ?, ?)
+        RETURNING id
+        """,
+        [
+            "running",
+            requested_start,
+            requested_end,
+            int(universe_symbols_considered),
+            int(symbols_attempted),
+            int(symbols_succeeded),
+            int(symbols_failed),
+            last_error,
+        ],
+    ).fetchone()
 
     return job_id
 
 
+# One statement text for every status write: NULL state / considered leave
+# the stored value alone, and finished_at is stamped only when asked.
+_UPDATE_JOB_SQL = f"""
+    UPDATE {TABLE_NAME}
+    SET
+        state = COALESCE(?, state),
+        universe_symbols_considered = COALESCE(?, universe_symbols_considered),
+        finished_at = CASE WHEN ? THEN {UTC_NOW_SQL} ELSE finished_at END,
+        symbols_attempted = ?,
+        symbols_succeeded = ?,
+        symbols_failed = ?,
+        last_error = ?
+    WHERE id = ?
+"""
+
+
+def _write_job_status(
+    job_id: str,
+    *,
+    state: Optional[str],
+    universe_symbols_considered: Optional[int],
+    finished: bool,
+    symbols_attempted: int,
+    symbols_succeeded: int,
+    symbols_failed: int,
+    last_error: Optional[str],
+) -> None:
+    con = _get_conn()
+    con.execute(
+        _UPDATE_JOB_SQL,
+        [
+            state,
+            None if universe_symbols_considered is None else int(universe_symbols_considered),
+            finished,
+            int(symbols_attempted),
+            int(symbols_succeeded),
+            int(symbols_failed),
+            last_error,
+            job_id,
+        ],
+    )
+    _touch_job(job_id)
+
+
 def update_ingest_job_progress(
     job_id: str,
     *,
@@ -144,51 +216,17 @@ def update_ingest_job_progress(
     Update counters while job is still running.
     Does NOT set finished_at.
     """
-    _ensure_schema()
-
-    sets = []
-    params = []
-
-    if state is not None:
-        sets.append("state = ?")
-        params.append(state)
-
-    if universe_symbols_considered is not None:
-        sets.append("universe_symbols_considered = ?")
-        params.append(int(universe_symbols_considered))
-
-    sets.extend(
-        [
-            "symbols_attempted = ?",
-            "symbols_succeeded = ?",
-            "symbols_failed = ?",
-            "last_error = ?",
-        ]
-    )
-    params.extend(
-        [
-            int(symbols_attempted),
-            int(symbols_succeeded),
-            int(symbols_failed),
-            last_error,
-        ]
+    _write_job_status(
+        job_id,
+        state=state,
+        universe_symbols_considered=universe_symbols_considered,
+        finished=False,
+        symbols_attempted=symbols_attempted,
+        symbols_succeeded=symbols_succeeded,
+        symbols_failed=symbols_failed,
+        last_error=last_error,
     )
 
-    params.append(job_id)
-
-    con = _get_conn()
-    try:
-        con.execute(
-            f"""
-            UPDATE {TABLE_NAME}
-            SET {", ".join(sets)}
-            WHERE id = ?
-            """,
-            params,
-        )
-    finally:
-        con.close()
-
 
 def update_ingest_job(
     job_id: str,
@@ -205,115 +243,66 @@ def update_ingest_job(
     IMPORTANT FIX:
     - finished_at is ONLY set when state != 'running'
     """
-    _ensure_schema()
-    now = datetime.utcnow()
-
-    con = _get_conn()
-    try:
-        if state == "running":
-            con.execute(
-                f"""
-                UPDATE {TABLE_NAME}
-                SET
-                    state = ?,
-                    symbols_attempted = ?,
-                    symbols_succeeded = ?,
-                    symbols_failed = ?,
-                    last_error = ?
-                WHERE id = ?
-                """,
-                [
-                    state,
-                    int(symbols_attempted),
-                    int(symbols_succeeded),
-                    int(symbols_failed),
-                    last_error,
-                    job_id,
-                ],
-            )
-        else:
-            con.execute(
-                f"""
-                UPDATE {TABLE_NAME}
-                SET
-                    finished_at = ?,
-                    state = ?,
-                    symbols_attempted = ?,
-                    symbols_succeeded = ?,
-                    symbols_failed = ?,
-                    last_error = ?
-                WHERE id = ?
-                """,
-                [
-                    now,
-                    state,
-                    int(symbols_attempted),
-                    int(symbols_succeeded),
-                    int(symbols_failed),
-                    last_error,
-                    job_id,
-                ],
-            )
-    finally:
-        con.close()
+    _write_job_status(
+        job_id,
+        state=state,
+        universe_symbols_considered=None,
+        finished=state != "running",
+        symbols_attempted=symbols_attempted,
+        symbols_succeeded=symbols_succeeded,
+        symbols_failed=symbols_failed,
+        last_error=last_error,
+    )
 
 
 def get_latest_ingest_job() -> Optional[Dict[str, Any]]:
-    _ensure_schema()
     con = _get_conn()
-    try:
-        row = con.execute(
-            f"""
-            SELECT
-                id,
-                created_at,
-                started_at,
-                finished_at,
-                state,
-                requested_start,
-                requested_end,
-                universe_symbols_considered,
-                symbols_attempted,
-                symbols_succeeded,
-                symbols_failed,
-                last_error
-            FROM {TABLE_NAME}
-            ORDER BY created_at DESC
-            LIMIT 1
-            """
-        ).fetchone()
-    finally:
-        con.close()
+    row = con.execute(
+        f"""
+        SELECT
+            id,
+            created_at,
+            started_at,
+            finished_at,
+            state,
+            requested_start,
+            requested_end,
+            universe_symbols_considered,
+            symbols_attempted,
+            symbols_succeeded,
+            symbols_failed,
+            last_error
+        FROM {TABLE_NAME}
+        ORDER BY created_at DESC
+        LIMIT 1
+        """
+    ).fetchone()
 
     return _row_to_job_dict(row)
 
 
 def get_ingest_job(job_id: str) -> Optional[Dict[str, Any]]:
-    _ensure_schema()
     con = _get_conn()
-    try:
-        row = con.execute(
-            f"""
-            SELECT
-                id,
-                created_at,
-                started_at,
-                finished_at,
-                state,
-                requested_start,
-                requested_end,
-                universe_symbols_considered,
-                symbols_attempted,
-                symbols_succeeded,
-                symbols_failed,
-                last_error
-            FROM {TABLE_NAME}
-            WHERE id = ?
-            """,
-            [job_id],
-        ).fetchone()
-    finally:
-        con.close()
+    row = con.execute(
+        f"""
+        SELECT
+            id,
+            created_at,
+            started_at,
+            finished_at,
+            state,
+            requested_start,
+            requested_end,
+            universe_symbols_considered,
+            symbols_attempted,
+            symbols_succeeded,
+            symbols_failed,
+            last_error
+        FROM {TABLE_NAME}
+        WHERE id = ?
+        """,
+        [job_id],
+    ).fetchone()
 
     return _row_to_job_dict(row)
 
@@ -337,17 +326,15 @@ def _row_to_job_dict(row) -> Optional[Dict[str, Any]]:
         last_error,
     ) = row
 
-    def _iso(dt):
-        return dt.isoformat() if dt is not None else None
-
+    # Native datetime / date values; the API layer serializes them.
     return {
         "id": id_,
-        "created_at": _iso(created_at),
-        "started_at": _iso(started_at),
-        "finished_at": _iso(finished_at),
+        "created_at": created_at,
+        "started_at": started_at,
+        "finished_at": finished_at,
         "state": state,
-        "requested_start": requested_start.isoformat(),
-        "requested_end": requested_end.isoformat(),
+        "requested_start": requested_start,
+        "requested_end": requested_end,
         "universe_symbols_considered": int(universe_symbols_considered),
         "symbols_attempted": int(symbols_attempted),
         "symbols_succeeded": int(symbols_succeeded),
@@ -364,34 +351,46 @@ def _row_to_job_dict(row) -> Optional[Dict[str, Any]]:
 def create_job_items(job_id: str, symbols: List[str]) -> None:
     """
     Initialize job items (pending) for each symbol. Safe if called once.
+
+    Symbols go in as one Arrow column and a single set-based INSERT;
+    existing (job_id, symbol) rows are left alone.
     """
-    _ensure_schema()
-    now = datetime.utcnow()
+    if not symbols:
+        return
 
-    records = []
-    for s in symbols:
-        records.append((job_id, s.upper(), "pending", 0, None, now))
+    # Upper-case and de-duplicate in Arrow kernels; the constant columns
+    # are filled in by the INSERT rather than repeated per row here.
+    unique = pc.unique(pc.utf8_upper(pa.array(symbols, pa.string())))
+    batch = pa.table({"symbol": unique})
 
     con = _get_conn()
     try:
-        con.execute("BEGIN")
-        con.executemany(
+        con.register("_tmp_items", batch)
+        con.execute(
             f"""
-            INSERT OR IGNORE INTO {ITEMS_TABLE}
+            INSERT INTO {ITEMS_TABLE}
                 (job_id, symbol, state, attempts, last_error, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?)
+            SELECT ?, symbol, 'pending', 0, NULL, {UTC_NOW_SQL}
+            FROM _tmp_items
+            ON CONFLICT DO NOTHING
             """,
-            records,
+            [job_id],
         )
-        con.execute("COMMIT")
-    except Exception:
-        try:
-            con.execute("ROLLBACK")
-        except Exception:
-            pass
-        raise
     finally:
-        con.close()
+        con.unregister("_tmp_items")
+    _touch_job(job_id)
+
+
+# One statement text for both set_item_state paths; inc_attempt binds 0 or 1.
+_SET_ITEM_STATE_SQL = f"""
+    UPDATE {ITEMS_TABLE}
+    SET
+        state = ?,
+        attempts = attempts + ?,
+        last_error = ?,
+        updated_at = {UTC_NOW_SQL}
+    WHERE job_id = ? AND symbol = ?
+"""
 
 
 def set_item_state(
@@ -402,71 +401,107 @@ def set_item_state(
     inc_attempt: bool = False,
     last_error: Optional[str] = None,
 ) -> None:
-    _ensure_schema()
-    now = datetime.utcnow()
+    """
+    Move one item to a new state.
 
+    symbol is upper-cased to match how create_job_items stored it.
+    """
     con = _get_conn()
-    try:
-        if inc_attempt:
-            con.execute(
-                f"""
-                UPDATE {ITEMS_TABLE}
-                SET
-                    state = ?,
-                    attempts = attempts + 1,
-                    last_error = ?,
-                    updated_at = ?
-                WHERE job_id = ? AND symbol = ?
-                """,
-                [state, last_error, now, job_id, symbol.upper()],
-            )
-        else:
-            con.execute(
-                f"""
-                UPDATE {ITEMS_TABLE}
-                SET
-                    state = ?,
-                    last_error = ?,
-                    updated_at = ?
-                WHERE job_id = ? AND symbol = ?
-                """,
-                [state, last_error, now, job_id, symbol.upper()],
-            )
-    finally:
-        con.close()
+    con.execute(
+        _SET_ITEM_STATE_SQL,
+        [state, int(inc_attempt), last_error, job_id, symbol.upper()],
+    )
+    _touch_job(job_id)
 
 
-def get_job_progress(job_id: str) -> Dict[str, Any]:
+def set_item_states(
+    job_id: str,
+    updates: List[Tuple[str, ItemState, bool, Optional[str]]],
+) -> None:
     """
-    Returns pending/running/succeeded/failed counts + pct.
+    Apply many set_item_state transitions with one UPDATE ... FROM.
+
+    Each update is (symbol, state, inc_attempt, last_error); symbols are
+    upper-cased as in set_item_state. Callers buffer transitions and flush
+    them here, e.g. once per batch of symbols. A symbol listed more than
+    once ends in its last state, with every requested attempt counted.
     """
-    _ensure_schema()
+    if not updates:
+        return
+
+    merged: Dict[str, List[Any]] = {}
+    for symbol, state, inc_attempt, last_error in updates:
+        symbol = symbol.upper()
+        prev = merged.get(symbol)
+        inc = int(inc_attempt) + (prev[1] if prev else 0)
+        merged[symbol] = [state, inc, last_error]
+
+    batch = pa.table(
+        {
+            "symbol": pa.array(list(merged), pa.string()),
+            "state": pa.array([m[0] for m in merged.values()], pa.string()),
+            "inc": pa.array([m[1] for m in merged.values()], pa.int32()),
+            "last_error": pa.array([m[2] for m in merged.values()], pa.string()),
+        }
+    )
+
     con = _get_conn()
     try:
-        totals = con.execute(
+        con.register("_tmp_item_states", batch)
+        con.execute(
             f"""
-            SELECT
-                COUNT(*) AS total,
-                SUM(CASE WHEN state = 'pending' THEN 1 ELSE 0 END) AS pending,
-                SUM(CASE WHEN state = 'running' THEN 1 ELSE 0 END) AS running,
-                SUM(CASE WHEN state = 'succeeded' THEN 1 ELSE 0 END) AS succeeded,
-                SUM(CASE WHEN state = 'failed' THEN 1 ELSE 0 END) AS failed
-            FROM {ITEMS_TABLE}
-            WHERE job_id = ?
+            UPDATE {ITEMS_TABLE} AS t
+            SET
+                state = u.state,
+                attempts = t.attempts + u.inc,
+                last_error = u.last_error,
+                updated_at = {UTC_NOW_SQL}
+            FROM _tmp_item_states AS u
+            WHERE t.job_id = ? AND t.symbol = u.symbol
             """,
             [job_id],
-        ).fetchone()
+        )
     finally:
-        con.close()
+        con.unregister("_tmp_item_states")
+    _touch_job(job_id)
+
+
+def get_job_progress(job_id: str) -> Dict[str, Any]:
+    """
+    Returns pending/running/succeeded/failed counts + pct.
+
+    Served from _PROGRESS_CACHE until the next write to this job.
+    """
+    rev = _PROGRESS_REV.get(job_id, 0)
+    cached = _PROGRESS_CACHE.get(job_id)
+    if cached is not None and cached[0] == rev:
+        return dict(cached[1])
+
+    con = _get_conn()
+    # Item counts and the parent job's state in one query; filtered
+    # aggregates give zeros for absent states.
+    state, total, pending, running, succeeded, failed = con.execute(
+        f"""
+        SELECT
+            (SELECT state FROM {TABLE_NAME} WHERE id = ?),
+            COUNT(*)::INTEGER,
+            COUNT(*) FILTER (WHERE state = 'pending')::INTEGER,
+            COUNT(*) FILTER (WHERE state = 'running')::INTEGER,
+            COUNT(*) FILTER (WHERE state = 'succeeded')::INTEGER,
+            COUNT(*) FILTER (WHERE state = 'failed')::INTEGER
+        FROM {ITEMS_TABLE}
+        WHERE job_id = ?
+        """,
+        [job_id, job_id],
+    ).fetchone()
 
-    total, pending, running, succeeded, failed = [int(x or 0) for x in totals]
     done = succeeded + failed
     pct = (done / total * 100.0) if total > 0 else 0.0
 
-    job = get_ingest_job(job_id)
-    state = job["state"] if job else "unknown"
+    if state is None:
+        state = "unknown"
 
-    return {
+    progress = {
         "job_id": job_id,
         "state": state,
         "total": total,
@@ -476,16 +511,21 @@ def get_job_progress(job_id: str) -> Dict[str, Any]:
         "failed": failed,
         "pct_complete": pct,
     }
+    # A write that landed during the query may or may not be in the result.
+    if _PROGRESS_REV.get(job_id, 0) == rev:
+        _PROGRESS_CACHE[job_id] = (rev, progress)
+    return dict(progress)
 
 
 def list_symbols_for_resume(job_id: str) -> List[str]:
     """
     Resume logic: retry only pending + failed.
     """
-    _ensure_schema()
     con = _get_conn()
-    try:
-        rows = con.execute(
+    # Arrow export skips a Python tuple per row; pa.table() accepts the
+    # Table or RecordBatchReader that .arrow() returns across duckdb versions.
+    symbols = pa.table(
+        con.execute(
             f"""
             SELECT symbol
             FROM {ITEMS_TABLE}
@@ -494,8 +534,7 @@ def list_symbols_for_resume(job_id: str) -> List[str]:
             ORDER BY symbol
             """,
             [job_id],
-        ).fetchall()
-    finally:
-        con.close()
+        ).arrow()
+    )["symbol"]
 
-    return [r[0] for r in rows]
+    return symbols.to_pylist()
@@ -2,10 +2,17 @@
 
 from __future__ import annotations
 
+import atexit
+import functools
 import os
+import threading
+from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple, TypedDict
 
 import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
+from app.datalake.duckdb_settings import UTC_NOW_SQL, apply_duckdb_settings
 from app.datalake.fmp_client import FmpSymbolDTO
 
 # Use the same DuckDB file everywhere (env wins, default is DO/dev-friendly)
@@ -25,77 +32,207 @@ class UniverseStats(TypedDict):
     by_cap_bucket: Dict[str, int]
 
 
-def _get_conn(read_only: bool = False) -> duckdb.DuckDBPyConnection:
+class UniverseMeta(TypedDict):
+    sectors: List[str]
+    exchanges: List[str]
+    min_market_cap: Optional[float]
+    max_market_cap: Optional[float]
+    last_updated_at: Optional[datetime]
+
+
+@functools.lru_cache(maxsize=1)
+def _conn() -> duckdb.DuckDBPyConnection:
+    """
+    Process-wide DuckDB connection, opened once on first use.
     """
-    Always open DuckDB with a single consistent configuration.
+    con = duckdb.connect(TP_DUCKDB_PATH)
+    apply_duckdb_settings(con)
+    atexit.register(con.close)
+    return con
+
+
+_LOCAL = threading.local()
+
 
-    DuckDB does not like multiple connections to the same file with
-    different configs (including read_only), so we ignore the flag and
-    enforce "read-only" at the application level instead.
+def _get_conn() -> duckdb.DuckDBPyConnection:
     """
-    return duckdb.connect(TP_DUCKDB_PATH)
+    This thread's cursor on the shared connection, created on first use
+    and never closed by callers (same pattern as eodhd_queue).
+
+    Each FastAPI worker thread thus reuses one cursor across requests
+    instead of opening a fresh one per stats / browse call. There is no
+    read-only variant: DuckDB refuses a second open of the same file with
+    a different config, so "read-only" is enforced at the application level.
+    """
+    con = getattr(_LOCAL, "con", None)
+    if con is None:
+        con = _LOCAL.con = _conn().cursor()
+    return con
 
 
 def _ensure_schema() -> None:
     """
     Make sure the symbol_universe table exists.
     """
-    con = _get_conn(read_only=False)
-    try:
-        con.execute(
-            f"""
-            CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
-                symbol              TEXT PRIMARY KEY,
-                name                TEXT NOT NULL,
-                exchange            TEXT NOT NULL,
-                sector              TEXT,
-                industry            TEXT,
-                market_cap          DOUBLE NOT NULL,
-                price               DOUBLE NOT NULL,
-                is_etf              BOOLEAN NOT NULL,
-                is_actively_trading BOOLEAN NOT NULL
-            )
-            """
+    con = _get_conn()
+    con.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+            symbol              TEXT PRIMARY KEY,
+            name                TEXT,
+            exchange            TEXT NOT NULL,
+            sector              TEXT,
+            industry            TEXT,
+            market_cap          DOUBLE,
+            price               DOUBLE,
+            is_etf              BOOLEAN,
+            is_fund             BOOLEAN,
+            is_actively_trading BOOLEAN,
+            updated_at          TIMESTAMP
         )
-    finally:
-        con.close()
+        """
+    )
+
+    # Same table as the FMP ingest route writes (routes/datalake_fmp.py),
+    # whose screener rows may lack name / price / flags. Bring tables
+    # created by the older, stricter DDL into line.
+    con.execute(f"ALTER TABLE {TABLE_NAME} ADD COLUMN IF NOT EXISTS is_fund BOOLEAN")
+    con.execute(f"ALTER TABLE {TABLE_NAME} ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP")
+    for column in ("name", "market_cap", "price", "is_etf", "is_actively_trading"):
+        con.execute(f"ALTER TABLE {TABLE_NAME} ALTER COLUMN {column} DROP NOT NULL")
+
+    # Reads compare the stored values directly (see normalize_universe_batch);
+    # bring rows written before ingest-time normalization into the same
+    # canonical form. Only rows that differ are touched, so this is a
+    # no-op scan once the table is clean.
+    #
+    # Symbols first: a legacy 'aapl' / ' AAPL' row becomes 'AAPL'. Where the
+    # canonical symbol is already taken (or several legacy spellings share
+    # it), keep the canonical row, else one legacy row, and drop the rest so
+    # the rename cannot collide on the primary key.
+    con.execute(
+        f"""
+        DELETE FROM {TABLE_NAME} AS a
+        WHERE a.symbol <> UPPER(TRIM(a.symbol))
+          AND EXISTS (
+            SELECT 1
+            FROM {TABLE_NAME} AS b
+            WHERE UPPER(TRIM(b.symbol)) = UPPER(TRIM(a.symbol))
+              AND (b.symbol = UPPER(TRIM(b.symbol)) OR b.symbol > a.symbol)
+          )
+        """
+    )
+    con.execute(
+        f"""
+        UPDATE {TABLE_NAME}
+        SET symbol = UPPER(TRIM(symbol))
+        WHERE symbol <> UPPER(TRIM(symbol))
+        """
+    )
+    con.execute(
+        f"""
+        UPDATE {TABLE_NAME}
+        SET
+            exchange = COALESCE(NULLIF(UPPER(TRIM(exchange)), ''), 'UNKNOWN'),
+            sector = NULLIF(TRIM(sector), ''),
+            industry = NULLIF(TRIM(industry), '')
+        WHERE (exchange, sector, industry) IS DISTINCT FROM (
+            COALESCE(NULLIF(UPPER(TRIM(exchange)), ''), 'UNKNOWN'),
+            NULLIF(TRIM(sector), ''),
+            NULLIF(TRIM(industry), '')
+        )
+        """
+    )
 
 
-# Ensure table exists on import
+# Tables are created once at import; the functions below assume they exist.
 _ensure_schema()
 
 
+# Column types for the upsert batch, in upsert_universe's INSERT column order.
+_UNIVERSE_ARROW_SCHEMA = pa.schema(
+    [
+        ("symbol", pa.string()),
+        ("name", pa.string()),
+        ("exchange", pa.string()),
+        ("sector", pa.string()),
+        ("industry", pa.string()),
+        ("market_cap", pa.float64()),
+        ("price", pa.float64()),
+        ("is_etf", pa.bool_()),
+        ("is_actively_trading", pa.bool_()),
+    ]
+)
+
+
+def _blank_to_null(arr: pa.ChunkedArray) -> pa.ChunkedArray:
+    trimmed = pc.utf8_trim_whitespace(arr)
+    return pc.if_else(pc.equal(trimmed, ""), None, trimmed)
+
+
+def normalize_universe_batch(batch: pa.Table) -> pa.Table:
+    """
+    Canonical form of a symbol_universe batch, computed once per ingest so
+    reads can group and filter on the stored values directly: symbol
+    trimmed and upper case, exchange trimmed and upper case ('UNKNOWN' when
+    blank), sector / industry trimmed with blanks stored as NULL.
+
+    Every writer of symbol_universe goes through this; other columns pass
+    through untouched.
+    """
+    symbol = pc.utf8_upper(pc.utf8_trim_whitespace(batch["symbol"]))
+    batch = batch.set_column(batch.schema.get_field_index("symbol"), "symbol", symbol)
+    exchange = pc.fill_null(_blank_to_null(pc.utf8_upper(batch["exchange"])), "UNKNOWN")
+    batch = batch.set_column(batch.schema.get_field_index("exchange"), "exchange", exchange)
+    for key in ("sector", "industry"):
+        batch = batch.set_column(batch.schema.get_field_index(key), key, _blank_to_null(batch[key]))
+    return batch
+
+
 def upsert_universe(rows: List[FmpSymbolDTO]) -> int:
     """
     Insert / update the FMP symbol universe into DuckDB.
 
-    - Deduplicates by symbol (PRIMARY KEY).
+    - Deduplicates by upper-cased symbol (PRIMARY KEY); a repeated symbol
+      keeps its last row, since one upsert statement cannot touch a key twice.
     - Safe to call repeatedly; newer rows overwrite old ones.
+    - Rows go in as one Arrow batch and a single set-based statement.
     """
     if not rows:
         return 0
 
-    records = [
-        (
-            row["symbol"],
-            row["name"],
-            row["exchange"],
-            row.get("sector"),
-            row.get("industry"),
-            float(row["market_cap"]),
-            float(row["price"]),
-            bool(row["is_etf"]),
-            bool(row["is_actively_trading"]),
-        )
-        for row in rows
-    ]
+    # Symbols are stored upper case, so browse searches can match them
+    # without an UPPER() per row.
+    last = {row["symbol"].strip().upper(): row for row in rows}
+
+    batch = pa.Table.from_pylist(
+        [
+            {
+                "symbol": symbol,
+                "name": row["name"],
+                "exchange": row["exchange"],
+                "sector": row.get("sector"),
+                "industry": row.get("industry"),
+                "market_cap": row["market_cap"],
+                "price": row["price"],
+                "is_etf": bool(row["is_etf"]),
+                "is_actively_trading": bool(row["is_actively_trading"]),
+            }
+            for symbol, row in last.items()
+        ],
+        schema=_UNIVERSE_ARROW_SCHEMA,
+    )
+    batch = normalize_universe_batch(batch)
 
-    con = _get_conn(read_only=False)
+    con = _get_conn()
     try:
-        con.execute("BEGIN")
-        con.executemany(
+        con.register("_tmp_universe", batch)
+        # Name the columns: FmpSymbolDTO has no is_fund, which keeps its
+        # stored value. Rows whose values did not change are left alone
+        # rather than rewritten (updated_at included).
+        con.execute(
             f"""
-            INSERT OR REPLACE INTO {TABLE_NAME} (
+            INSERT INTO {TABLE_NAME} AS u (
                 symbol,
                 name,
                 exchange,
@@ -104,23 +241,79 @@ def upsert_universe(rows: List[FmpSymbolDTO]) -> int:
                 market_cap,
                 price,
                 is_etf,
-                is_actively_trading
+                is_actively_trading,
+                updated_at
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            records,
+            SELECT *, {UTC_NOW_SQL} FROM _tmp_universe
+            ON CONFLICT (symbol) DO UPDATE SET
+                name = excluded.name,
+                exchange = excluded.exchange,
+                sector = excluded.sector,
+                industry = excluded.industry,
+                market_cap = excluded.market_cap,
+                price = excluded.price,
+                is_etf = excluded.is_etf,
+                is_actively_trading = excluded.is_actively_trading,
+                updated_at = excluded.updated_at
+            WHERE (
+                u.name,
+                u.exchange,
+                u.sector,
+                u.industry,
+                u.market_cap,
+                u.price,
+                u.is_etf,
+                u.is_actively_trading
+            ) IS DISTINCT FROM (
+                excluded.name,
+                excluded.exchange,
+                excluded.sector,
+                excluded.industry,
+                excluded.market_cap,
+                excluded.price,
+                excluded.is_etf,
+                excluded.is_actively_trading
+            )
+            """
         )
-        con.execute("COMMIT")
-    except Exception:
-        try:
-            con.execute("ROLLBACK")
-        except Exception:
-            pass
-        raise
     finally:
-        con.close()
+        con.unregister("_tmp_universe")
+
+    # The upsert has committed: invalidate the caches before anything else
+    # can fail.
+    invalidate_universe_cache()
+
+    # Rows only get DuckDB's column compression (dictionary / FSST for the
+    # low-cardinality strings, bit-packing for the flags) once they are
+    # checkpointed from the WAL into the table; with the raised checkpoint
+    # threshold that would otherwise wait for some later write. Best effort:
+    # CHECKPOINT refuses to run while another write transaction is open
+    # (e.g. a bar ingest), and the next automatic checkpoint compresses the
+    # rows then.
+    try:
+        con.execute("CHECKPOINT")
+    except duckdb.TransactionException:
+        pass
+
+    return batch.num_rows
+
 
-    return len(records)
+# Stats and browse metadata only change when symbol_universe is written, so
+# they are memoized per universe version. Code that writes the table
+# without going through upsert_universe must call invalidate_universe_cache.
+_UNIVERSE_VERSION = 0
+_STATS_CACHE: Dict[int, UniverseStats] = {}
+_META_CACHE: Dict[int, UniverseMeta] = {}
+
+
+def invalidate_universe_cache() -> None:
+    """
+    Drop the memoized stats / metadata after a write to symbol_universe.
+    """
+    global _UNIVERSE_VERSION
+    _UNIVERSE_VERSION += 1
+    _STATS_CACHE.clear()
+    _META_CACHE.clear()
 
 
 def get_universe_stats() -> UniverseStats:
@@ -133,87 +326,79 @@ def get_universe_stats() -> UniverseStats:
       - by_type (EQUITY vs ETF)
       - by_sector
       - by_cap_bucket (penny/small/mid/large)
-    """
 
-    _ensure_schema()
+    Served from memory until the next write (see invalidate_universe_cache);
+    treat the result as read-only.
+    """
+    version = _UNIVERSE_VERSION
+    stats = _STATS_CACHE.get(version)
+    if stats is None:
+        stats = _STATS_CACHE[version] = _compute_universe_stats()
+    return stats
+
+
+def _compute_universe_stats() -> UniverseStats:
+    # One scan for every breakdown: GROUPING SETS computes the total and
+    # each per-dimension count in a single pass over the table.
+    #
+    # Cap buckets:
+    #   - penny: price < 5
+    #   - UNKNOWN: no market_cap
+    #   - small_cap: market_cap < 2B
+    #   - mid_cap:   2B–10B
+    #   - large_cap: >= 10B
     con = _get_conn()
-    try:
-        # Total rows
-        total_row = con.execute(f"SELECT COUNT(*) FROM {TABLE_NAME}").fetchone()
-        total_symbols = int(total_row[0]) if total_row else 0
-
-        # By exchange
-        exchange_rows = con.execute(
-            f"""
-            SELECT
-              COALESCE(NULLIF(TRIM(exchange), ''), 'UNKNOWN') AS exch,
-              COUNT(*) AS n
-            FROM {TABLE_NAME}
-            GROUP BY exch
-            ORDER BY n DESC
-            """
-        ).fetchall()
-        by_exchange: Dict[str, int] = {exch: int(n) for exch, n in exchange_rows}
-
-        # By type (ETF vs EQUITY)
-        type_rows = con.execute(
-            f"""
-            SELECT
-              CASE WHEN is_etf THEN 'ETF' ELSE 'EQUITY' END AS t,
-              COUNT(*) AS n
-            FROM {TABLE_NAME}
-            GROUP BY t
-            ORDER BY n DESC
-            """
-        ).fetchall()
-        by_type: Dict[str, int] = {t: int(n) for t, n in type_rows}
-
-        # By sector (top sectors; UNKNOWN grouped)
-        sector_rows = con.execute(
-            f"""
-            SELECT
-              COALESCE(NULLIF(TRIM(sector), ''), 'UNKNOWN') AS s,
-              COUNT(*) AS n
-            FROM {TABLE_NAME}
-            GROUP BY s
-            ORDER BY n DESC
-            """
-        ).fetchall()
-        by_sector: Dict[str, int] = {s: int(n) for s, n in sector_rows}
-
-        # By cap bucket:
-        #   - penny: price < 5
-        #   - small_cap: market_cap < 2B
-        #   - mid_cap:   2B–10B
-        #   - large_cap: >= 10B
-        cap_rows = con.execute(
-            f"""
-            SELECT bucket, COUNT(*) AS n
-            FROM (
-              SELECT
-                CASE
-                  WHEN price < 5 THEN 'penny'
-                  WHEN market_cap < 2e9 THEN 'small_cap'
-                  WHEN market_cap < 10e9 THEN 'mid_cap'
-                  ELSE 'large_cap'
-                END AS bucket
-              FROM {TABLE_NAME}
-            )
-            GROUP BY bucket
-            ORDER BY n DESC
-            """
-        ).fetchall()
-        by_cap_bucket: Dict[str, int] = {bucket: int(n) for bucket, n in cap_rows}
-
-        return UniverseStats(
-            total_symbols=total_symbols,
-            by_exchange=by_exchange,
-            by_type=by_type,
-            by_sector=by_sector,
-            by_cap_bucket=by_cap_bucket,
+    rows = con.execute(
+        f"""
+        SELECT
+          CASE
+            WHEN GROUPING(exch) = 0 THEN 'exchange'
+            WHEN GROUPING(t) = 0 THEN 'type'
+            WHEN GROUPING(s) = 0 THEN 'sector'
+            WHEN GROUPING(bucket) = 0 THEN 'cap_bucket'
+            ELSE 'total'
+          END AS dim,
+          COALESCE(exch, t, s, bucket) AS k,
+          COUNT(*) AS n
+        FROM (
+          SELECT
+            COALESCE(exchange, 'UNKNOWN') AS exch,
+            CASE WHEN is_etf THEN 'ETF' ELSE 'EQUITY' END AS t,
+            COALESCE(sector, 'UNKNOWN') AS s,
+            CASE
+              WHEN price < 5 THEN 'penny'
+              WHEN market_cap IS NULL THEN 'UNKNOWN'
+              WHEN market_cap < 2e9 THEN 'small_cap'
+              WHEN market_cap < 10e9 THEN 'mid_cap'
+              ELSE 'large_cap'
+            END AS bucket
+          FROM {TABLE_NAME}
         )
-    finally:
-        con.close()
+        GROUP BY GROUPING SETS ((exch), (t), (s), (bucket), ())
+        ORDER BY n DESC
+        """
+    ).fetchall()
+
+    total_symbols = 0
+    groups: Dict[str, Dict[str, int]] = {
+        "exchange": {},
+        "type": {},
+        "sector": {},
+        "cap_bucket": {},
+    }
+    for dim, key, n in rows:
+        if dim == "total":
+            total_symbols = int(n)
+        else:
+            groups[dim][key] = int(n)
+
+    return UniverseStats(
+        total_symbols=total_symbols,
+        by_exchange=groups["exchange"],
+        by_type=groups["type"],
+        by_sector=groups["sector"],
+        by_cap_bucket=groups["cap_bucket"],
+    )
 
 
 # ---------- Universe browser helpers ----------
@@ -240,142 +425,176 @@ def browse_universe(
     - exchange filter
     - sorting
     """
-    _ensure_schema()
     con = _get_conn()
-    try:
-        # Clamp page + page_size
-        page = max(1, page)
-        page_size = max(1, min(page_size, 500))
-
-        # Build WHERE
-        where_clauses: List[str] = []
-        params: List[Any] = []
-
-        if search:
-            s = f"%{search.strip().upper()}%"
-            where_clauses.append("(UPPER(symbol) LIKE ? OR UPPER(name) LIKE ?)")
-            params.extend([s, s])
-
-        if sector:
-            where_clauses.append("COALESCE(NULLIF(TRIM(sector), ''), 'UNKNOWN') = ?")
-            params.append(sector)
-
-        if exchanges:
-            exch_clean = [ex.strip().upper() for ex in exchanges if ex.strip()]
-            if exch_clean:
-                placeholders = ", ".join(["?"] * len(exch_clean))
-                where_clauses.append(f"exchange IN ({placeholders})")
-                params.extend(exch_clean)
-
-        if min_market_cap is not None:
-            where_clauses.append("market_cap >= ?")
-            params.append(float(min_market_cap))
-
-        if max_market_cap is not None:
-            where_clauses.append("market_cap <= ?")
-            params.append(float(max_market_cap))
-
-        where_sql = ""
-        if where_clauses:
-            where_sql = " WHERE " + " AND ".join(where_clauses)
-
-        # Sorting
-        sort_map = {
-            "symbol": "symbol",
-            "name": "name",
-            "sector": "sector",
-            "exchange": "exchange",
-            "market_cap": "market_cap",
-            "price": "price",
-        }
-        sort_column = sort_map.get(sort_by, "symbol")
-        sort_dir_sql = "DESC" if sort_dir.lower() == "desc" else "ASC"
-
-        # Total count
-        total_row = con.execute(
-            f"SELECT COUNT(*) FROM {TABLE_NAME}{where_sql}",
-            params,
-        ).fetchone()
+    # Clamp page + page_size
+    page = max(1, page)
+    page_size = max(1, min(page_size, 500))
+
+    # Build WHERE
+    where_clauses: List[str] = []
+    params: List[Any] = []
+
+    # Columns are compared as stored (normalized at ingest), never through a
+    # per-row function, so DuckDB can push the predicates into the scan.
+    if search:
+        s = f"%{search.strip().upper()}%"
+        where_clauses.append("(symbol LIKE ? OR name ILIKE ?)")
+        params.extend([s, s])
+
+    if sector:
+        if sector == "UNKNOWN":
+            where_clauses.append("(sector IS NULL OR sector = ?)")
+        else:
+            where_clauses.append("sector = ?")
+        params.append(sector)
+
+    if exchanges:
+        exch_clean = [ex.strip().upper() for ex in exchanges if ex.strip()]
+        if exch_clean:
+            placeholders = ", ".join(["?"] * len(exch_clean))
+            where_clauses.append(f"exchange IN ({placeholders})")
+            params.extend(exch_clean)
+
+    if min_market_cap is not None:
+        where_clauses.append("market_cap >= ?")
+        params.append(float(min_market_cap))
+
+    if max_market_cap is not None:
+        where_clauses.append("market_cap <= ?")
+        params.append(float(max_market_cap))
+
+    where_sql = ""
+    if where_clauses:
+        where_sql = " WHERE " + " AND ".join(where_clauses)
+
+    # Sorting
+    sort_map = {
+        "symbol": "symbol",
+        "name": "name",
+        "sector": "sector",
+        "exchange": "exchange",
+        "market_cap": "market_cap",
+        "price": "price",
+    }
+    sort_column = sort_map.get(sort_by, "symbol")
+    sort_dir_sql = "DESC" if sort_dir.lower() == "desc" else "ASC"
+
+    # Page slice
+    offset = (page - 1) * page_size
+
+    # Only the key and the sort column go through the sort; the rest of
+    # the row is joined back for the page alone. The filtered total rides
+    # along on every page row, so count and page come from one scan.
+    # symbol breaks ties so pages are stable.
+    order_sql = f"{sort_column} {sort_dir_sql}"
+    if sort_column != "symbol":
+        order_sql += f", symbol {sort_dir_sql}"
+    rows = con.execute(
+        f"""
+        WITH page AS (
+          SELECT symbol, COUNT(*) OVER () AS total
+          FROM {TABLE_NAME}
+          {where_sql}
+          ORDER BY {order_sql}
+          LIMIT ? OFFSET ?
+        )
+        SELECT
+          symbol,
+          name,
+          exchange,
+          sector,
+          industry,
+          market_cap,
+          price,
+          is_etf,
+          is_fund,
+          is_actively_trading,
+          page.total
+        FROM page
+        JOIN {TABLE_NAME} USING (symbol)
+        ORDER BY {order_sql}
+        """,
+        params + [page_size, offset],
+    ).fetchall()
+
+    if rows:
+        total_items = int(rows[0][-1])
+    elif offset:
+        # Paged past the end: no row to carry the total.
+        total_row = con.execute(f"SELECT COUNT(*) FROM {TABLE_NAME}{where_sql}", params).fetchone()
         total_items = int(total_row[0]) if total_row else 0
+    else:
+        total_items = 0
+
+    items: List[Dict[str, Any]] = []
+    for (
+        symbol,
+        name,
+        exchange,
+        sector_val,
+        industry,
+        market_cap,
+        price,
+        is_etf,
+        is_fund,
+        is_actively_trading,
+        _total,
+    ) in rows:
+        # Screener rows may lack any of these; keep NULL as None.
+        items.append(
+            {
+                "symbol": symbol,
+                "name": name,
+                "exchange": exchange,
+                "sector": sector_val,
+                "industry": industry,
+                "market_cap": float(market_cap) if market_cap is not None else None,
+                "price": float(price) if price is not None else None,
+                "is_etf": bool(is_etf) if is_etf is not None else None,
+                "is_fund": bool(is_fund) if is_fund is not None else None,
+                "is_actively_trading": (
+                    bool(is_actively_trading) if is_actively_trading is not None else None
+                ),
+            }
+        )
 
-        # Page slice
-        offset = (page - 1) * page_size
-
-        rows = con.execute(
-            f"""
-            SELECT
-              symbol,
-              name,
-              exchange,
-              sector,
-              industry,
-              market_cap,
-              price,
-              is_etf,
-              is_actively_trading
-            FROM {TABLE_NAME}
-            {where_sql}
-            ORDER BY {sort_column} {sort_dir_sql}
-            LIMIT ? OFFSET ?
-            """,
-            params + [page_size, offset],
-        ).fetchall()
-
-        items: List[Dict[str, Any]] = []
-        for (
-            symbol,
-            name,
-            exchange,
-            sector_val,
-            industry,
-            market_cap,
-            price,
-            is_etf,
-            is_actively_trading,
-        ) in rows:
-            items.append(
-                {
-                    "symbol": symbol,
-                    "name": name,
-                    "exchange": exchange,
-                    "sector": sector_val,
-                    "industry": industry,
-                    "market_cap": float(market_cap),
-                    "price": float(price),
-                    "is_etf": bool(is_etf),
-                    "is_actively_trading": bool(is_actively_trading),
-                }
-            )
+    meta = get_universe_meta()
+    return (
+        items,
+        total_items,
+        meta["sectors"],
+        meta["exchanges"],
+        meta["min_market_cap"],
+        meta["max_market_cap"],
+    )
 
-        # Available sectors (full table, not filtered)
-        sector_rows = con.execute(
-            f"""
-            SELECT DISTINCT
-              COALESCE(NULLIF(TRIM(sector), ''), 'UNKNOWN') AS s
-            FROM {TABLE_NAME}
-            ORDER BY s ASC
-            """
-        ).fetchall()
-        sectors = [s for (s,) in sector_rows]
 
-        # Available exchanges (full table)
-        exch_rows = con.execute(
+def get_universe_meta() -> UniverseMeta:
+    """
+    Whole-table facts for the browser filters and the FMP summary (not
+    filtered): sectors, exchanges, the market-cap range and the latest
+    updated_at. Computed in one scan and memoized per universe version;
+    treat the result as read-only.
+    """
+    version = _UNIVERSE_VERSION
+    meta = _META_CACHE.get(version)
+    if meta is None:
+        sectors, exchanges, min_cap, max_cap, last_updated_at = _get_conn().execute(
             f"""
-            SELECT DISTINCT
-              COALESCE(NULLIF(TRIM(exchange), ''), 'UNKNOWN') AS e
+            SELECT
+              list(DISTINCT COALESCE(sector, 'UNKNOWN')),
+              list(DISTINCT COALESCE(exchange, 'UNKNOWN')),
+              MIN(market_cap),
+              MAX(market_cap),
+              MAX(updated_at)
             FROM {TABLE_NAME}
-            ORDER BY e ASC
             """
-        ).fetchall()
-        exch_list = [e for (e,) in exch_rows]
-
-        # Global cap range
-        cap_row = con.execute(
-            f"SELECT MIN(market_cap), MAX(market_cap) FROM {TABLE_NAME}"
         ).fetchone()
-        min_cap_global = float(cap_row[0]) if cap_row and cap_row[0] is not None else None
-        max_cap_global = float(cap_row[1]) if cap_row and cap_row[1] is not None else None
-
-        return items, total_items, sectors, exch_list, min_cap_global, max_cap_global
-    finally:
-        con.close()
+        meta = _META_CACHE[version] = UniverseMeta(
+            sectors=sorted(sectors or []),
+            exchanges=sorted(exchanges or []),
+            min_market_cap=float(min_cap) if min_cap is not None else None,
+            max_market_cap=float(max_cap) if max_cap is not None else None,
+            last_updated_at=last_updated_at,
+        )
+    return meta
@@ -3,14 +3,17 @@ import secrets
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import BaseModel
 
 from .config import CONFIG
 
 app = FastAPI(title="TradePopping Backend")
 
-from app.auth import ACTIVE_TOKENS, get_current_user
+from app.auth import ACTIVE_TOKENS, bearer_scheme, get_current_user
+from app.datahub import polygon_client
+from app.datalake import eodhd_client, fmp_client
 from app.routes import datalake_universe
 
 # Register routers
@@ -26,9 +29,19 @@ app.include_router(datalake_bars.router, prefix="/api")
 app.include_router(datalake_eodhd.router, prefix="/api")
 app.include_router(datalake_universe.router, prefix="/api")
 
+
+@app.on_event("shutdown")
+async def close_http_clients() -> None:
+    """Close the shared provider HTTP clients (keep-alive pools)."""
+    await polygon_client.aclose_client()
+    await eodhd_client.aclose_client()
+    await fmp_client.aclose_client()
+
+
 # --- AUTH CONFIG ---
 ALLOWED_EMAIL = os.getenv("TP_ALLOWED_EMAIL")
 ENTRY_CODE = os.getenv("TP_ENTRY_CODE")
+TP_DUCKDB_PATH = os.getenv("TP_DUCKDB_PATH", "/data/tradepopping.duckdb")
 
 print(
     f"[AUTH CONFIG] TP_ALLOWED_EMAIL={ALLOWED_EMAIL!r}, " f"TP_ENTRY_CODE set={bool(ENTRY_CODE)}",
@@ -83,6 +96,9 @@ class DataSourceTestResponse(BaseModel):
 
 USER_SETTINGS_STORE: dict[str, UserSettings] = {}
 
+# Returned for users who never saved settings; built once, never mutated.
+_DEFAULT_USER_SETTINGS = UserSettings()
+
 
 # --- BASIC ROUTES ---
 @app.get("/")
@@ -92,8 +108,7 @@ def root():
 
 @app.get("/health")
 def health():
-    env = os.getenv("API_ENV", "unknown")
-    return {"status": "ok", "environment": env}
+    return {"status": "ok", "environment": CONFIG.api_env}
 
 
 @app.get("/api/health", include_in_schema=False)
@@ -106,15 +121,19 @@ class AppConfig(BaseModel):
     version: str
 
 
+# Built once: the config never changes after startup.
+_PUBLIC_APP_CONFIG = AppConfig(
+    environment=CONFIG.app_env,
+    version=CONFIG.app_version,
+)
+
+
 @app.get("/api/config", response_model=AppConfig)
 def get_config():
     """
     Simple config endpoint the frontend can call on boot.
     """
-    return AppConfig(
-        environment=CONFIG.app_env,
-        version=CONFIG.app_version,
-    )
+    return _PUBLIC_APP_CONFIG
 
 
 DATA_SOURCES = [
@@ -129,12 +148,17 @@ DATA_SOURCES = [
     },
 ]
 
+# Env vars don't change after startup; read each provider key once.
+_HAS_API_KEY: dict[str, bool] = {
+    src["id"]: bool(os.getenv(src["env_key"], "").strip()) for src in DATA_SOURCES
+}
+
 
 # --- DATA SOURCE HELPERS ---
 def build_data_source_status() -> List[DataSourceStatus]:
     statuses = []
     for src in DATA_SOURCES:
-        has_key = bool(os.getenv(src["env_key"], "").strip())
+        has_key = _HAS_API_KEY[src["id"]]
         statuses.append(
             DataSourceStatus(
                 id=src["id"],
@@ -155,6 +179,11 @@ def build_data_ingest_status() -> List[DataIngestStatus]:
     return statuses
 
 
+# Both lists depend only on startup state, so the routes serve one snapshot.
+_DATA_SOURCE_STATUSES = build_data_source_status()
+_DATA_INGEST_STATUSES = build_data_ingest_status()
+
+
 # --- AUTH ENDPOINTS ---
 @app.post("/api/auth/login", response_model=LoginResponse)
 def login(payload: LoginRequest):
@@ -168,12 +197,10 @@ def login(payload: LoginRequest):
 
 
 @app.post("/api/auth/logout")
-def logout(request: Request):
-    auth = request.headers.get("Authorization")
-    if not auth or not auth.startswith("Bearer "):
+def logout(creds: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)):
+    if creds is None:
         return {"detail": "Already logged out"}
-    token = auth.split(" ", 1)[1]
-    ACTIVE_TOKENS.discard(token)
+    ACTIVE_TOKENS.discard(creds.credentials)
     return {"detail": "Logged out"}
 
 
@@ -190,7 +217,7 @@ def auth_me(current_user: dict = Depends(get_current_user)):
 # --- USER SETTINGS ---
 @app.get("/api/user/settings", response_model=UserSettings)
 def get_user_settings(current_user: dict = Depends(get_current_user)):
-    return USER_SETTINGS_STORE.get(current_user["email"], UserSettings())
+    return USER_SETTINGS_STORE.get(current_user["email"], _DEFAULT_USER_SETTINGS)
 
 
 @app.put("/api/user/settings", response_model=UserSettings)
@@ -202,12 +229,12 @@ def update_user_settings(settings: UserSettings, current_user: dict = Depends(ge
 # --- DATA SOURCE ROUTES ---
 @app.get("/api/data/sources", response_model=List[DataSourceStatus])
 def get_data_sources(current_user: dict = Depends(get_current_user)):
-    return build_data_source_status()
+    return _DATA_SOURCE_STATUSES
 
 
 @app.get("/api/data/ingest/status", response_model=List[DataIngestStatus])
 def ingest_status(current_user: dict = Depends(get_current_user)):
-    return build_data_ingest_status()
+    return _DATA_INGEST_STATUSES
 
 
 @app.post("/api/data/sources/test", response_model=DataSourceTestResponse)
@@ -215,7 +242,7 @@ def test_api_source(payload: DataSourceTestRequest, current_user: dict = Depends
     src = next((s for s in DATA_SOURCES if s["id"] == payload.source_id), None)
     if not src:
         raise HTTPException(status_code=404, detail="Unknown data source id")
-    has_key = bool(os.getenv(src["env_key"], "").strip())
+    has_key = _HAS_API_KEY[src["id"]]
     if not has_key:
         return DataSourceTestResponse(
             id=src["id"],
@@ -246,4 +273,4 @@ if __name__ == "__main__":
 
 @app.get("/api/debug/duckdb-path")
 def debug_duckdb_path(current_user: dict = Depends(get_current_user)):
-    return {"TP_DUCKDB_PATH": os.getenv("TP_DUCKDB_PATH", "/data/tradepopping.duckdb")}
+    return {"TP_DUCKDB_PATH": TP_DUCKDB_PATH}
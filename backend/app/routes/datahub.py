@@ -1,7 +1,7 @@
 # backend/app/routers/datahub.py
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
@@ -250,7 +250,9 @@ async def ingest_eodhd_window(
     symbols_failed = 0
     rows_observed = symbols_selected * 10  # dummy
 
-    job_id = f"job-{int(datetime.utcnow().timestamp())}"
+    # One clock read for the job id and all of its timestamps.
+    now = datetime.now(timezone.utc)
+    job_id = f"job-{int(now.timestamp())}"
     job_state = "succeeded"
 
     # Build ingest response
@@ -268,7 +270,7 @@ async def ingest_eodhd_window(
         job_state=job_state,
     )
 
-    now_iso = datetime.utcnow().isoformat() + "Z"
+    now_iso = now.replace(tzinfo=None).isoformat() + "Z"
 
     _LAST_EODHD_JOB = EodhdJobStatus(
         id=job_id,
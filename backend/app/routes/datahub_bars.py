@@ -51,6 +51,8 @@ async def get_daily_ohlcv(
     For now, we keep it simple and always call ingest_eodhd_window
     so the cache stays fresh, then read from DuckDB.
     """
+    symbol = symbol.upper()
+
     try:
         # For now: always refresh EODHD window so DuckDB stays current.
         # Later we can optimize to only call EODHD if cache is missing.
@@ -68,4 +70,5 @@ async def get_daily_ohlcv(
             detail=f"Unexpected error while fetching daily OHLCV: {e}",
         )
 
-    return [PriceBarOut(**bar) for bar in dto_bars]
+    # Plain dicts; response_model validates them once on the way out.
+    return dto_bars
@@ -1,18 +1,21 @@
 from __future__ import annotations
 
 import os
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
 import duckdb
 from app.auth import get_current_user
-from app.datalake.bar_store import archive_old_daily_bars, ingest_eodhd_window, read_daily_bars
+from app.datalake.bar_store import (
+    archive_old_daily_bars,
+    ingest_eodhd_universe,
+    ingest_eodhd_window,
+)
 from app.datalake.eodhd_queue import (
     enqueue,
     get_counts,
-    mark_failed,
-    mark_succeeded,
-    pop_next,
+    mark_batch,
+    pop_batch,
     reset_stale_running_to_pending,
 )
 from app.datalake.ingest_jobs import (
@@ -116,9 +119,9 @@ class EodhdFullHistoryStartResponse(BaseModel):
 
 class EodhdJobStatusResponse(BaseModel):
     id: str
-    created_at: Optional[str]
-    started_at: Optional[str]
-    finished_at: Optional[str]
+    created_at: Optional[datetime]
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
     state: str
 
     requested_start: date
@@ -310,15 +313,16 @@ async def ingest_eodhd_for_universe(
     total_rows_observed = 0
 
     try:
+        # Fetches overlap with DuckDB writes; rows observed are the rows
+        # each symbol's upsert wrote for the window.
+        written, errors = await ingest_eodhd_universe(symbols, payload.start, payload.end)
         for sym in symbols:
-            try:
-                await ingest_eodhd_window(symbol=sym, start=payload.start, end=payload.end)
-                bars = read_daily_bars(symbol=sym, start=payload.start, end=payload.end)
-                total_rows_observed += len(bars)
-                succeeded += 1
-            except Exception as e:
+            if sym in errors:
                 failed += 1
-                failed_symbols.append(f"{sym}: {e}")
+                failed_symbols.append(f"{sym}: {errors[sym]}")
+            else:
+                total_rows_observed += written[sym]
+                succeeded += 1
 
         job_state = "succeeded" if failed == 0 else "failed"
         last_error = None if failed == 0 else "Some symbols failed during ingest."
@@ -390,15 +394,16 @@ async def ingest_eodhd_full_history_route(
     total_rows_observed = 0
 
     try:
+        # Fetches overlap with DuckDB writes; rows observed are the rows
+        # each symbol's upsert wrote for the window.
+        written, errors = await ingest_eodhd_universe(symbols, start_date, end_date)
         for sym in symbols:
-            try:
-                await ingest_eodhd_window(symbol=sym, start=start_date, end=end_date)
-                bars = read_daily_bars(symbol=sym, start=start_date, end=end_date)
-                total_rows_observed += len(bars)
-                succeeded += 1
-            except Exception as e:
+            if sym in errors:
                 failed += 1
-                failed_symbols.append(f"{sym}: {e}")
+                failed_symbols.append(f"{sym}: {errors[sym]}")
+            else:
+                total_rows_observed += written[sym]
+                succeeded += 1
 
         job_state = "succeeded" if failed == 0 else "failed"
         last_error = None if failed == 0 else "Some symbols failed during ingest."
@@ -486,30 +491,39 @@ async def _run_resumable_job(
 
     # 3. Main work loop
     while True:
-        item = pop_next(job_id=job_id, max_attempts=5)
-        if item is None:
+        # Claim work in batches: one queue transaction per batch, not per item.
+        items = pop_batch(job_id=job_id, max_attempts=5)
+        if not items:
             break
 
-        sym = str(item["symbol"])
-        ws = item["window_start"]
-        we = item["window_end"]
+        # Outcomes are written back once per claimed batch. If the worker
+        # dies mid-batch the items stay 'running' and are reset as stale.
+        outcomes: List[Tuple[str, date, date, Optional[str]]] = []
+        for item in items:
+            sym = str(item["symbol"])
+            ws = item["window_start"]
+            we = item["window_end"]
 
-        attempted += 1
-        try:
-            await ingest_eodhd_window(symbol=sym, start=ws, end=we)
-            mark_succeeded(job_id, sym, ws, we)
-            succeeded += 1
-        except Exception as e:
-            mark_failed(job_id, sym, ws, we, str(e))
-            failed += 1
+            attempted += 1
+            try:
+                await ingest_eodhd_window(symbol=sym, start=ws, end=we)
+                outcomes.append((sym, ws, we, None))
+                succeeded += 1
+            except Exception as e:
+                outcomes.append((sym, ws, we, str(e)))
+                failed += 1
 
+        mark_batch(job_id, outcomes)
+        # Job counters follow the queue, once per batch.
         update_ingest_job_progress(
             job_id,
             state="running",
             symbols_attempted=attempted,
             symbols_succeeded=succeeded,
             symbols_failed=failed,
-            last_error=None if failed == 0 else "Some queue items failed (see eodhd_ingest_queue).",
+            last_error=(
+                None if failed == 0 else "Some queue items failed (see eodhd_ingest_queue)."
+            ),
         )
 
     # 4. Finalize
@@ -666,8 +680,8 @@ async def get_latest_eodhd_job(
         started_at=data["started_at"],
         finished_at=data["finished_at"],
         state=data["state"],
-        requested_start=date.fromisoformat(data["requested_start"]),
-        requested_end=date.fromisoformat(data["requested_end"]),
+        requested_start=data["requested_start"],
+        requested_end=data["requested_end"],
         universe_symbols_considered=data["universe_symbols_considered"],
         symbols_attempted=data["symbols_attempted"],
         symbols_succeeded=data["symbols_succeeded"],
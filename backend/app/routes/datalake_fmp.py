@@ -3,12 +3,20 @@
 from __future__ import annotations
 
 import os
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Set
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
 
 import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
 import requests
 from app.auth import get_current_user
+from app.datalake.universe_store import (
+    get_universe_meta,
+    get_universe_stats,
+    invalidate_universe_cache,
+    normalize_universe_batch,
+)
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
@@ -22,6 +30,11 @@ def _get_conn() -> duckdb.DuckDBPyConnection:
     return duckdb.connect(TP_DUCKDB_PATH)
 
 
+def _utcnow() -> datetime:
+    """Current time as a naive UTC datetime (replaces the deprecated utcnow())."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 # ---------------------------------------------------------------------------
 # Models
 # ---------------------------------------------------------------------------
@@ -86,56 +99,19 @@ class FmpUniverseIngestResponse(BaseModel):
 async def get_fmp_universe_summary(
     current_user: Dict[str, Any] = Depends(get_current_user),
 ):
-    con = _get_conn()
-    try:
-        tables = con.execute(
-            "SELECT table_name FROM information_schema.tables "
-            "WHERE table_name = 'symbol_universe';"
-        ).fetchall()
-
-        if not tables:
-            return FmpUniverseSummary(
-                total_symbols=0,
-                exchanges=[],
-                last_ingested_at=None,
-                min_market_cap=None,
-                max_market_cap=None,
-            )
-
-        total_symbols = con.execute("SELECT COUNT(*) FROM symbol_universe;").fetchone()[0]
-
-        exchange_rows = con.execute(
-            "SELECT DISTINCT exchange FROM symbol_universe ORDER BY exchange;"
-        ).fetchall()
-        exchanges = [r[0] for r in exchange_rows if r[0] is not None]
-
-        min_cap = None
-        max_cap = None
-        try:
-            min_cap, max_cap = con.execute(
-                "SELECT MIN(market_cap), MAX(market_cap) FROM symbol_universe;"
-            ).fetchone()
-        except Exception:
-            min_cap = None
-            max_cap = None
-
-        last_ingested_at: Optional[str] = None
-        try:
-            row = con.execute("SELECT MAX(updated_at) FROM symbol_universe;").fetchone()
-            if row and row[0] is not None:
-                last_ingested_at = str(row[0])
-        except Exception:
-            last_ingested_at = None
-
-        return FmpUniverseSummary(
-            total_symbols=int(total_symbols),
-            exchanges=exchanges,
-            last_ingested_at=last_ingested_at,
-            min_market_cap=float(min_cap) if min_cap is not None else None,
-            max_market_cap=float(max_cap) if max_cap is not None else None,
-        )
-    finally:
-        con.close()
+    # Both come from universe_store's memoized reads, invalidated on every
+    # write to symbol_universe.
+    stats = get_universe_stats()
+    meta = get_universe_meta()
+    last_ingested_at = meta["last_updated_at"]
+
+    return FmpUniverseSummary(
+        total_symbols=stats["total_symbols"],
+        exchanges=meta["exchanges"],
+        last_ingested_at=str(last_ingested_at) if last_ingested_at is not None else None,
+        min_market_cap=meta["min_market_cap"],
+        max_market_cap=meta["max_market_cap"],
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -246,6 +222,8 @@ def _shape_row(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         return None
 
     name = row.get("companyName") or row.get("name")
+    # Raw strings; _upsert_symbol_universe brings the batch into
+    # universe_store's canonical form.
     exchange = row.get("exchange")
     sector = row.get("sector")
     industry = row.get("industry")
@@ -276,11 +254,11 @@ def _shape_row(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     price_val = float(price) if price is not None else None
 
     return {
-        "symbol": str(symbol).upper(),
+        "symbol": str(symbol),
         "name": name,
-        "exchange": exchange,
-        "sector": sector,
-        "industry": industry,
+        "exchange": None if exchange is None else str(exchange),
+        "sector": None if sector is None else str(sector),
+        "industry": None if industry is None else str(industry),
         "market_cap": market_cap_val,
         "price": price_val,
         "is_etf": bool(is_etf),
@@ -289,6 +267,23 @@ def _shape_row(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     }
 
 
+# Column types for the ingest batch, in _shape_row key order.
+_FMP_UNIVERSE_SCHEMA = pa.schema(
+    [
+        ("symbol", pa.string()),
+        ("name", pa.string()),
+        ("exchange", pa.string()),
+        ("sector", pa.string()),
+        ("industry", pa.string()),
+        ("market_cap", pa.float64()),
+        ("price", pa.float64()),
+        ("is_etf", pa.bool_()),
+        ("is_fund", pa.bool_()),
+        ("is_actively_trading", pa.bool_()),
+    ]
+)
+
+
 def _upsert_symbol_universe(
     con: duckdb.DuckDBPyConnection,
     records: List[Dict[str, Any]],
@@ -297,15 +292,27 @@ def _upsert_symbol_universe(
     Simple refresh strategy:
       - DELETE all rows
       - INSERT the new universe
+    in one transaction, so a failed insert leaves the old universe intact.
+
+    Records are normalized with universe_store's canonical form; the first
+    record per (normalized) symbol wins.
 
     We stamp ALL inserted rows with the same updated_at = now_utc,
     so MAX(updated_at) becomes the ingest time.
     """
-    started_at = datetime.utcnow()
+    started_at = _utcnow()
 
-    if not records:
+    batch = normalize_universe_batch(pa.Table.from_pylist(records, schema=_FMP_UNIVERSE_SCHEMA))
+    batch = batch.filter(pc.not_equal(batch["symbol"], ""))
+    first: Dict[str, int] = {}
+    for i, sym in enumerate(batch["symbol"].to_pylist()):
+        first.setdefault(sym, i)
+    if len(first) != batch.num_rows:
+        batch = batch.take(list(first.values()))
+
+    if batch.num_rows == 0:
         existing_total = con.execute("SELECT COUNT(*) FROM symbol_universe;").fetchone()[0]
-        finished_at = datetime.utcnow()
+        finished_at = _utcnow()
         return FmpUniverseIngestResponse(
             symbols_ingested=0,
             symbols_updated=0,
@@ -315,40 +322,40 @@ def _upsert_symbol_universe(
             finished_at=finished_at.isoformat() + "Z",
         )
 
-    con.execute("DELETE FROM symbol_universe;")
-
-    now_utc = datetime.utcnow()
-
-    insert_sql = """
-        INSERT INTO symbol_universe
-            (symbol, name, exchange, sector, industry,
-             market_cap, price, is_etf, is_fund, is_actively_trading, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """
+    # Deterministic-ish order: exchange then symbol
+    batch = batch.sort_by([("exchange", "ascending"), ("symbol", "ascending")])
+    now_utc = _utcnow()
+    batch = batch.append_column(
+        "updated_at", pa.array([now_utc] * batch.num_rows, pa.timestamp("us"))
+    )
 
-    for rec in records:
+    try:
+        con.execute("BEGIN")
+        con.execute("DELETE FROM symbol_universe;")
+        con.register("_tmp_fmp_universe", batch)
         con.execute(
-            insert_sql,
-            [
-                rec["symbol"],
-                rec.get("name"),
-                rec.get("exchange"),
-                rec.get("sector"),
-                rec.get("industry"),
-                rec.get("market_cap"),
-                rec.get("price"),
-                rec.get("is_etf"),
-                rec.get("is_fund"),
-                rec.get("is_actively_trading"),
-                now_utc,
-            ],
+            """
+            INSERT INTO symbol_universe
+                (symbol, name, exchange, sector, industry,
+                 market_cap, price, is_etf, is_fund, is_actively_trading, updated_at)
+            SELECT * FROM _tmp_fmp_universe
+            """
         )
+        con.execute("COMMIT")
+    except Exception:
+        try:
+            con.execute("ROLLBACK")
+        except Exception:
+            pass
+        raise
+    finally:
+        con.unregister("_tmp_fmp_universe")
 
     total_after = con.execute("SELECT COUNT(*) FROM symbol_universe;").fetchone()[0]
-    finished_at = datetime.utcnow()
+    finished_at = _utcnow()
 
     return FmpUniverseIngestResponse(
-        symbols_ingested=len(records),
+        symbols_ingested=batch.num_rows,
         symbols_updated=0,
         symbols_skipped=0,
         total_symbols_after=int(total_after),
@@ -382,8 +389,9 @@ async def ingest_fmp_universe(
         if include_all_share_classes not in {"true", "false"}:
             include_all_share_classes = "false"
 
-        merged: Dict[str, Dict[str, Any]] = {}
-        seen: Set[str] = set()
+        # Dedupe (first exchange wins) and ordering happen in
+        # _upsert_symbol_universe, after normalization.
+        records: List[Dict[str, Any]] = []
 
         for ex in exchanges:
             raw = _fetch_from_fmp_for_exchange(
@@ -398,18 +406,8 @@ async def ingest_fmp_universe(
             )
             for row in raw:
                 shaped = _shape_row(row)
-                if not shaped:
-                    continue
-                sym = shaped["symbol"]
-                if sym in seen:
-                    continue
-                seen.add(sym)
-                merged[sym] = shaped
-
-        records = list(merged.values())
-
-        # Deterministic-ish order: exchange then symbol
-        records.sort(key=lambda r: (str(r.get("exchange") or ""), r["symbol"]))
+                if shaped:
+                    records.append(shaped)
 
         con = _get_conn()
         try:
@@ -417,6 +415,9 @@ async def ingest_fmp_universe(
             return _upsert_symbol_universe(con, records)
         finally:
             con.close()
+            # The refresh runs in one transaction; invalidating on failure
+            # too is cheap and keeps this unconditional.
+            invalidate_universe_cache()
 
     except Exception as exc:
         raise HTTPException(
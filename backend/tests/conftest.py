@@ -0,0 +1,8 @@
+# backend/tests/conftest.py
+
+import os
+import tempfile
+
+# The datalake modules open TP_DUCKDB_PATH at import, so point it at a
+# scratch file before any test module imports them.
+os.environ["TP_DUCKDB_PATH"] = os.path.join(tempfile.mkdtemp(), "test.duckdb")
@@ -0,0 +1,83 @@
+# backend/tests/test_bar_store.py
+
+from datetime import date
+
+import pyarrow as pa
+from app.datalake import bar_store
+
+
+def _bars_table(symbol, rows):
+    """Arrow batch in daily_bars column order from (date, close) pairs."""
+    n = len(rows)
+    return pa.Table.from_pydict(
+        {
+            "symbol": [symbol] * n,
+            "trade_date": [d for d, _ in rows],
+            **{c: [close for _, close in rows] for c in ("open", "high", "low", "close")},
+            "volume": [1.0] * n,
+            **{c: [None] * n for c in ("vwap", "turnover", "change_pct")},
+            **{
+                c: [close for _, close in rows]
+                for c in ("adj_open", "adj_high", "adj_low", "adj_close")
+            },
+        },
+        schema=bar_store._BARS_ARROW_SCHEMA,
+    )
+
+
+def test_upsert_daily_bar_tables_keeps_last_duplicate_bar():
+    d1, d2 = date(2024, 1, 2), date(2024, 1, 3)
+    batch = _bars_table("MSFT", [(d1, 1.0), (d2, 2.0), (d2, 3.0)])
+
+    assert bar_store.upsert_daily_bar_tables([("MSFT", batch)]) == {"MSFT": 2}
+
+    bars = bar_store.read_daily_bars("MSFT", d1, d2)
+    assert [(b["time"][:10], b["close"]) for b in bars] == [
+        ("2024-01-02", 1.0),
+        ("2024-01-03", 3.0),
+    ]
+
+
+def test_upsert_daily_bar_tables_dedupes_across_batches():
+    d = date(2024, 3, 1)
+    batches = [("nvda", _bars_table("NVDA", [(d, 1.0)])), ("NVDA", _bars_table("NVDA", [(d, 2.0)]))]
+
+    bar_store.upsert_daily_bar_tables(batches)
+
+    assert [b["close"] for b in bar_store.read_daily_bars("NVDA", d, d)] == [2.0]
+
+
+def test_upsert_daily_bars_dedupes_across_flush_chunks(monkeypatch):
+    monkeypatch.setattr(bar_store, "TP_DUCKDB_FLUSH_THRESHOLD", 2)
+    bars = [
+        {
+            "time": f"2024-02-0{day}T00:00:00+00:00",
+            "open": c,
+            "high": c,
+            "low": c,
+            "close": c,
+            "volume": 1.0,
+        }
+        for day, c in [(1, 1.0), (2, 2.0), (3, 3.0), (2, 4.0)]
+    ]
+
+    assert bar_store.upsert_daily_bars("aapl", bars) == 3
+
+    stored = bar_store.read_daily_bars("AAPL", date(2024, 2, 1), date(2024, 2, 3))
+    assert [b["close"] for b in stored] == [1.0, 4.0, 3.0]
+
+
+def test_partial_refetch_replaces_the_whole_window():
+    days = [date(2024, 4, d) for d in (1, 2, 3, 4)]
+    bar_store.upsert_daily_bar_tables([("AMZN", _bars_table("AMZN", [(d, 1.0) for d in days]))])
+
+    # Refetch covering Apr 2-4 without Apr 3: replace-by-window, not merge.
+    refetch = _bars_table("AMZN", [(days[1], 2.0), (days[3], 2.0)])
+    bar_store.upsert_daily_bar_tables([("AMZN", refetch)])
+
+    stored = bar_store.read_daily_bars("AMZN", days[0], days[-1])
+    assert [(b["time"][:10], b["close"]) for b in stored] == [
+        ("2024-04-01", 1.0),
+        ("2024-04-02", 2.0),
+        ("2024-04-04", 2.0),
+    ]
@@ -0,0 +1,69 @@
+# backend/tests/test_eodhd_queue.py
+
+from datetime import date
+
+from app.datalake import eodhd_queue
+
+WS, WE = date(2024, 1, 1), date(2024, 12, 31)
+
+
+def test_enqueue_counts_only_new_items():
+    job = "queue-enqueue"
+    assert eodhd_queue.enqueue(job_id=job, items=[("aapl", WS, WE), ("AAPL", WS, WE)]) == 1
+    assert eodhd_queue.enqueue(job_id=job, items=[("AAPL", WS, WE), ("MSFT", WS, WE)]) == 1
+    assert eodhd_queue.get_counts(job)["total"] == 2
+
+
+def test_pop_batch_claims_up_to_batch_size_and_marks_running():
+    job = "queue-claim"
+    eodhd_queue.enqueue(job_id=job, items=[(s, WS, WE) for s in ("A", "B", "C")])
+
+    items = eodhd_queue.pop_batch(job_id=job, batch_size=2)
+
+    assert [i["symbol"] for i in items] == ["A", "B"]
+    assert all(i["attempts"] == 1 for i in items)
+    counts = eodhd_queue.get_counts(job)
+    assert counts["running"] == 2
+    assert counts["pending"] == 1
+
+
+def test_failed_item_is_retried_until_max_attempts():
+    job = "queue-retry"
+    eodhd_queue.enqueue(job_id=job, items=[("AMD", WS, WE)])
+
+    for attempt in (1, 2):
+        (item,) = eodhd_queue.pop_batch(job_id=job, max_attempts=2)
+        assert item["attempts"] == attempt
+        eodhd_queue.mark_batch(job, [("AMD", WS, WE, "boom")])
+
+    assert eodhd_queue.pop_batch(job_id=job, max_attempts=2) == []
+    assert eodhd_queue.get_counts(job)["failed"] == 1
+
+
+def test_mark_batch_records_success_and_failure():
+    job = "queue-mark"
+    eodhd_queue.enqueue(job_id=job, items=[("IBM", WS, WE), ("ORCL", WS, WE)])
+    eodhd_queue.pop_batch(job_id=job)
+
+    eodhd_queue.mark_batch(job, [("ibm", WS, WE, None), ("ORCL", WS, WE, "boom")])
+
+    counts = eodhd_queue.get_counts(job)
+    assert (counts["succeeded"], counts["failed"], counts["running"]) == (1, 1, 0)
+
+
+def test_reset_stale_running_to_pending_counts_only_stale_items():
+    job = "queue-stale"
+    eodhd_queue.enqueue(job_id=job, items=[("F", WS, WE), ("GM", WS, WE)])
+    eodhd_queue.pop_batch(job_id=job)
+    eodhd_queue._get_conn().execute(
+        f"""
+        UPDATE {eodhd_queue.TABLE}
+        SET last_attempt_at = last_attempt_at - INTERVAL 1 HOUR
+        WHERE job_id = ? AND symbol = 'F'
+        """,
+        [job],
+    )
+
+    assert eodhd_queue.reset_stale_running_to_pending(job, stale_minutes=10) == 1
+    counts = eodhd_queue.get_counts(job)
+    assert (counts["pending"], counts["running"]) == (1, 1)
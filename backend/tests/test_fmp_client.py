@@ -0,0 +1,62 @@
+# backend/tests/test_fmp_client.py
+
+import asyncio
+
+import httpx
+import orjson
+from app.datalake import fmp_client
+
+_ROWS = [
+    {
+        "symbol": "aapl",
+        "companyName": "Apple Inc.",
+        "exchangeShortName": "NASDAQ",
+        "marketCap": 3e12,
+        "price": 190.0,
+    }
+]
+
+
+def _use_transport(monkeypatch, handler):
+    monkeypatch.setattr(fmp_client, "_base_params", lambda: {"apikey": "test-key"})
+    monkeypatch.setattr(fmp_client, "_UNIVERSE_CACHE", {})
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(fmp_client, "_get_client", lambda: client)
+
+
+def test_stale_universe_is_revalidated_with_etag(monkeypatch):
+    seen_etags = []
+
+    def handler(request):
+        etag = request.headers.get("if-none-match")
+        seen_etags.append(etag)
+        if etag == '"v1"':
+            return httpx.Response(304, headers={"etag": '"v1"'})
+        return httpx.Response(200, content=orjson.dumps(_ROWS), headers={"etag": '"v1"'})
+
+    _use_transport(monkeypatch, handler)
+    monkeypatch.setattr(fmp_client, "_UNIVERSE_CACHE_TTL", 0.0)
+
+    first = asyncio.run(fmp_client.fetch_fmp_symbol_universe())
+    second = asyncio.run(fmp_client.fetch_fmp_symbol_universe())
+
+    assert seen_etags == [None, '"v1"']
+    assert first == second
+    assert second[0]["symbol"] == "AAPL"
+
+
+def test_cached_universe_rows_are_copies(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, content=orjson.dumps(_ROWS))
+
+    _use_transport(monkeypatch, handler)
+
+    first = asyncio.run(fmp_client.fetch_fmp_symbol_universe())
+    first[0]["symbol"] = "MUTATED"
+    second = asyncio.run(fmp_client.fetch_fmp_symbol_universe())
+
+    assert len(calls) == 1
+    assert second[0]["symbol"] == "AAPL"
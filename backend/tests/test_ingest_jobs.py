@@ -0,0 +1,89 @@
+# backend/tests/test_ingest_jobs.py
+
+from datetime import date
+
+from app.datalake import ingest_jobs
+
+
+def _new_job(symbols):
+    job_id = ingest_jobs.create_ingest_job(
+        requested_start=date(2024, 1, 1),
+        requested_end=date(2024, 12, 31),
+        universe_symbols_considered=len(symbols),
+    )
+    ingest_jobs.create_job_items(job_id, symbols)
+    return job_id
+
+
+def test_get_job_progress_sees_writes_between_reads():
+    job_id = _new_job(["AAPL", "MSFT"])
+
+    before = ingest_jobs.get_job_progress(job_id)
+    assert (before["pending"], before["succeeded"]) == (2, 0)
+
+    ingest_jobs.set_item_state(job_id, "AAPL", state="succeeded")
+    after_item = ingest_jobs.get_job_progress(job_id)
+    assert (after_item["pending"], after_item["succeeded"]) == (1, 1)
+
+    ingest_jobs.update_ingest_job_progress(
+        job_id,
+        state="failed",
+        symbols_attempted=1,
+        symbols_succeeded=1,
+        symbols_failed=0,
+    )
+    assert ingest_jobs.get_job_progress(job_id)["state"] == "failed"
+
+
+def test_get_job_progress_skips_caching_a_read_raced_by_a_write(monkeypatch):
+    job_id = _new_job(["IBM"])
+    real_conn = ingest_jobs._get_conn
+
+    class _WriteDuringRead:
+        """Cursor stand-in that lands a write while the progress query runs."""
+
+        def execute(self, *args):
+            result = real_conn().execute(*args)
+            ingest_jobs._touch_job(job_id)
+            return result
+
+    monkeypatch.setattr(ingest_jobs, "_get_conn", _WriteDuringRead)
+    ingest_jobs.get_job_progress(job_id)
+
+    assert job_id not in ingest_jobs._PROGRESS_CACHE
+
+
+def test_set_item_states_applies_a_batch_of_transitions():
+    job_id = _new_job(["AMD", "INTC", "NVDA"])
+
+    ingest_jobs.set_item_states(
+        job_id,
+        [
+            ("amd", "running", True, None),
+            ("AMD", "succeeded", False, None),
+            ("intc", "failed", True, "boom"),
+            ("INTC", "failed", True, "boom again"),
+        ],
+    )
+
+    progress = ingest_jobs.get_job_progress(job_id)
+    assert (progress["pending"], progress["succeeded"], progress["failed"]) == (1, 1, 1)
+    assert ingest_jobs.list_symbols_for_resume(job_id) == ["INTC", "NVDA"]
+    attempts, last_error = (
+        ingest_jobs._get_conn()
+        .execute(
+            f"SELECT attempts, last_error FROM {ingest_jobs.ITEMS_TABLE} "
+            "WHERE job_id = ? AND symbol = 'INTC'",
+            [job_id],
+        )
+        .fetchone()
+    )
+    assert (attempts, last_error) == (2, "boom again")
+
+
+def test_set_item_state_accepts_lower_case_symbols():
+    job_id = _new_job(["TSLA"])
+
+    ingest_jobs.set_item_state(job_id, "tsla", state="succeeded", inc_attempt=True)
+
+    assert ingest_jobs.get_job_progress(job_id)["succeeded"] == 1
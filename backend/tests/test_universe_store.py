@@ -0,0 +1,78 @@
+# backend/tests/test_universe_store.py
+
+import asyncio
+
+from app.datalake import universe_store
+from app.routes import datalake_universe
+
+
+def _row(symbol, **overrides):
+    row = {
+        "symbol": symbol,
+        "name": f"{symbol} Inc.",
+        "exchange": "nasdaq",
+        "sector": "Technology",
+        "industry": None,
+        "market_cap": 5e9,
+        "price": 50.0,
+        "is_etf": False,
+        "is_actively_trading": True,
+    }
+    row.update(overrides)
+    return row
+
+
+def test_upsert_universe_stores_canonical_rows_and_refreshes_stats():
+    before = universe_store.get_universe_stats()
+
+    universe_store.upsert_universe(
+        [_row(" qqqa "), _row("QQQB", exchange=" ", sector="", market_cap=2e11)]
+    )
+
+    items, total, sectors, exchanges, _, max_cap = universe_store.browse_universe(
+        search="qqq", sort_by="market_cap", sort_dir="desc"
+    )
+    assert total == 2
+    assert [(i["symbol"], i["exchange"], i["sector"]) for i in items] == [
+        ("QQQB", "UNKNOWN", None),
+        ("QQQA", "NASDAQ", "Technology"),
+    ]
+    assert {"NASDAQ", "UNKNOWN"} <= set(exchanges)
+    assert "UNKNOWN" in sectors
+    assert max_cap >= 2e11
+
+    after = universe_store.get_universe_stats()
+    assert after["total_symbols"] == before["total_symbols"] + 2
+    assert after["by_exchange"]["UNKNOWN"] == before["by_exchange"].get("UNKNOWN", 0) + 1
+
+
+def test_browse_universe_pages_past_the_end_keep_the_total():
+    universe_store.upsert_universe([_row(f"PGX{i}") for i in range(3)])
+
+    items, total, *_ = universe_store.browse_universe(page=3, page_size=2, search="PGX")
+
+    assert items == []
+    assert total == 3
+
+
+def test_universe_meta_tracks_the_latest_write():
+    universe_store.upsert_universe([_row("METAA")])
+    first = universe_store.get_universe_meta()["last_updated_at"]
+
+    universe_store.upsert_universe([_row("METAA", price=51.0)])
+
+    assert universe_store.get_universe_meta()["last_updated_at"] > first
+
+
+def test_browse_route_serves_store_rows():
+    universe_store.upsert_universe([_row("RTEA", market_cap=None, price=None)])
+
+    resp = asyncio.run(
+        datalake_universe.browse_universe(
+            page=1, page_size=50, sort_by="symbol", sort_dir="asc", q="rtea", user={}
+        )
+    )
+
+    assert resp.total_count == 1
+    assert resp.symbols[0].symbol == "RTEA"
+    assert resp.symbols[0].market_cap is None